@@ -1,25 +1,30 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Query
+from fastapi.concurrency import run_in_threadpool
 from typing import List
 from io import BytesIO
-from docx import Document
 import fitz
 import logging
 
 from app.services.vector_service import (
     build_faiss_index_from_texts,
-    search_similar_texts
+    search_similar_texts,
+    search_similar_texts_batch
 )
+from app.services.embedding_service import EmbeddingUnavailableError
+from app.config.settings import settings
+from app.services.docx_reader import extract_docx_text
 from app.models.schemas import (
     SearchRequest,
     BuildIndexRequest,
+    BatchSearchRequest,
     AIResearchResponse,
+    BatchSearchResponse,
     ErrorResponse
 )
 
 # Initialize router
 router = APIRouter()
 logger = logging.getLogger(__name__)
-logger.setLevel(logging.INFO)
 
 # =============================
 # ✅ Build index from JSON body
@@ -31,9 +36,9 @@ async def build_index_route(request: BuildIndexRequest):
         raise HTTPException(status_code=400, detail="❌ Text and metadata counts do not match.")
     
     try:
-        build_faiss_index_from_texts(request.texts, request.metadata)
+        build_stats = await run_in_threadpool(build_faiss_index_from_texts, request.texts, request.metadata)
         logger.info("✅ Index built successfully from JSON.")
-        return {"message": "✅ Index built successfully."}
+        return {"message": "✅ Index built successfully.", "data": build_stats}
     
     except Exception as e:
         logger.error(f"❌ Index build failed: {e}")
@@ -43,6 +48,23 @@ async def build_index_route(request: BuildIndexRequest):
 # =============================
 # ✅ Build index from uploaded files (.txt, .pdf, .docx)
 # =============================
+class UnsupportedFormatError(ValueError):
+    """Raised for uploads whose extension has no text extractor."""
+
+
+def extract_uploaded_text(filename: str, content: bytes) -> str:
+    """Extract text based on file extension; raises UnsupportedFormatError for other formats."""
+    extension = filename.lower().split('.')[-1]
+    if extension == "txt":
+        return content.decode("utf-8")
+    if extension == "pdf":
+        with fitz.open(stream=content, filetype="pdf") as doc:
+            return "\n".join([page.get_text() for page in doc]) # type: ignore
+    if extension == "docx":
+        return extract_docx_text(BytesIO(content))
+    raise UnsupportedFormatError(f"Unsupported file format: {filename}")
+
+
 @router.post("/index-files", tags=["AI Document Research"],
              responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
 async def index_documents(files: List[UploadFile] = File(...), metadata: List[str] = Form(...)):
@@ -59,31 +81,26 @@ async def index_documents(files: List[UploadFile] = File(...), metadata: List[st
             if len(content) > MAX_FILE_SIZE_MB * 1024 * 1024:
                 raise HTTPException(status_code=400, detail=f"❌ File too large (>{MAX_FILE_SIZE_MB}MB): {filename}")
 
-            extension = filename.lower().split('.')[-1]
-
-            # Extract text based on file extension
-            if extension == "txt":
-                text = content.decode("utf-8")
-            elif extension == "pdf":
-                with fitz.open(stream=content, filetype="pdf") as doc:
-                    text = "\n".join([page.get_text() for page in doc]) # type: ignore
-            elif extension == "docx":
-                doc = Document(BytesIO(content))
-                text = "\n".join([para.text for para in doc.paragraphs])
-            else:
-                raise HTTPException(status_code=400, detail=f"❌ Unsupported file format: {filename}")
+            # Parsing is CPU-bound; keep it off the event loop
+            text = await run_in_threadpool(extract_uploaded_text, filename, content)
 
             texts.append(text)
             logger.info(f"✅ Processed file: {filename}")
 
+        except HTTPException:
+            raise
+        except UnsupportedFormatError:
+            raise HTTPException(status_code=400, detail=f"❌ Unsupported file format: {filename}")
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=400, detail=f"❌ File is not valid UTF-8: {filename}")
         except Exception as e:
             logger.error(f"❌ Error processing file {filename}: {e}")
             raise HTTPException(status_code=500, detail=f"❌ Error processing file {filename}: {str(e)}")
 
     try:
-        build_faiss_index_from_texts(texts, metadata)
+        build_stats = await run_in_threadpool(build_faiss_index_from_texts, texts, metadata)
         logger.info("✅ Documents indexed successfully.")
-        return {"message": "✅ Documents indexed successfully."}
+        return {"message": "✅ Documents indexed successfully.", "data": build_stats}
     
     except Exception as e:
         logger.error(f"❌ Indexing failed: {e}")
@@ -95,13 +112,13 @@ async def index_documents(files: List[UploadFile] = File(...), metadata: List[st
 # =============================
 @router.get("/search", tags=["AI Document Research"],
             response_model=AIResearchResponse,
-            responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
+            responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}, 503: {"model": ErrorResponse}})
 async def search_documents(query: str = Query(..., min_length=3), top_k: int = Query(5, ge=1, le=20)):
     if not query.strip():
         raise HTTPException(status_code=400, detail="❌ Query cannot be empty.")
 
     try:
-        results = search_similar_texts(query, top_k)
+        results = await run_in_threadpool(search_similar_texts, query, top_k)
         if not results or not results["results"]:
             raise HTTPException(status_code=404, detail="❌ No documents found.")
 
@@ -111,6 +128,10 @@ async def search_documents(query: str = Query(..., min_length=3), top_k: int = Q
             "answer": results["ai_summary"]
         }
 
+    except EmbeddingUnavailableError as e:
+        logger.error(f"❌ Search failed: {e}")
+        raise HTTPException(status_code=503, detail=f"❌ Embedding service unavailable: {str(e)}")
+
     except Exception as e:
         logger.error(f"❌ Search failed: {e}")
         raise HTTPException(status_code=500, detail=f"❌ Search failed: {str(e)}")
@@ -121,10 +142,10 @@ async def search_documents(query: str = Query(..., min_length=3), top_k: int = Q
 # =============================
 @router.post("/search-body", tags=["AI Document Research"],
              response_model=AIResearchResponse,
-             responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}})
+             responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}, 503: {"model": ErrorResponse}})
 async def search_with_body(request: SearchRequest):
     try:
-        results = search_similar_texts(request.query, top_k=request.top_k)
+        results = await run_in_threadpool(search_similar_texts, request.query, top_k=request.top_k)
         if not results or not results["results"]:
             raise HTTPException(status_code=404, detail="❌ No documents found.")
 
@@ -134,6 +155,47 @@ async def search_with_body(request: SearchRequest):
             "answer": results["ai_summary"]
         }
 
+    except EmbeddingUnavailableError as e:
+        logger.error(f"❌ Search failed: {e}")
+        raise HTTPException(status_code=503, detail=f"❌ Embedding service unavailable: {str(e)}")
+
     except Exception as e:
         logger.error(f"❌ Search failed: {e}")
-        raise HTTPException(status_code=500, detail=f"❌ Search failed: {str(e)}")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"❌ Search failed: {str(e)}")
+
+
+# =============================
+# ✅ Batch search (many queries, one embedding call + one FAISS search)
+# =============================
+@router.post("/search-batch", tags=["AI Document Research"],
+             response_model=BatchSearchResponse,
+             responses={400: {"model": ErrorResponse}, 500: {"model": ErrorResponse}, 503: {"model": ErrorResponse}})
+async def search_batch(request: BatchSearchRequest):
+    queries = [q.strip() for q in request.queries]
+    if any(not q for q in queries):
+        raise HTTPException(status_code=400, detail="❌ Queries cannot be empty.")
+    if len(queries) > settings.batch_search_max_queries:
+        raise HTTPException(
+            status_code=400,
+            detail=f"❌ Too many queries ({len(queries)} > {settings.batch_search_max_queries})."
+        )
+
+    try:
+        results = await run_in_threadpool(
+            search_similar_texts_batch, queries, top_k=request.top_k, include_answers=request.include_answers
+        )
+        logger.info(f"✅ Batch search successful. Queries: {len(queries)}, Top K: {request.top_k}")
+        return {
+            "results": [
+                {"query": r["query"], "matches": r["results"], "answer": r["ai_summary"]}
+                for r in results
+            ]
+        }
+
+    except EmbeddingUnavailableError as e:
+        logger.error(f"❌ Batch search failed: {e}")
+        raise HTTPException(status_code=503, detail=f"❌ Embedding service unavailable: {str(e)}")
+
+    except Exception as e:
+        logger.error(f"❌ Batch search failed: {e}")
+        raise HTTPException(status_code=500, detail=f"❌ Batch search failed: {str(e)}")
\ No newline at end of file
@@ -1,12 +1,12 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks
+from fastapi.concurrency import run_in_threadpool
 from fastapi.responses import FileResponse
 from pathlib import Path
-import shutil
 import uuid
 import logging
 
-from app.config.settings import settings
 from app.services.conversion_service import handle_conversion_to_format
+from app.services.storage_service import UPLOADS, save_bytes, track, release
 from app.models.schemas import StandardResponse, ErrorResponse
 
 router = APIRouter()
@@ -15,15 +15,6 @@ logger = logging.getLogger(__name__)
 ALLOWED_FORMATS = {"pdf", "txt", "docx", "jpg", "png"}
 MAX_FILE_SIZE = 20 * 1024 * 1024  # 20 MB
 
-def cleanup_files(paths: list[Path]):
-    for path in paths:
-        try:
-            if path.exists():
-                path.unlink()
-                logger.info(f"🧹 Deleted file: {path.name}")
-        except Exception as e:
-            logger.warning(f"⚠️ Cleanup failed for {path.name}: {e}")
-
 @router.post(
     "/convert",
     summary="Convert a document to a selected format",
@@ -44,27 +35,29 @@ async def convert_document(
         raise HTTPException(status_code=400, detail=f"❌ Unsupported target format: {target_format}")
 
     input_filename = f"{uuid.uuid4().hex}_{file.filename}"
-    temp_input_path = settings.upload_dir / input_filename
+
+    contents = await file.read()
+    if len(contents) > MAX_FILE_SIZE:
+        raise HTTPException(status_code=400, detail="❌ File size exceeds 20MB limit.")
 
     try:
-        contents = await file.read()
-        if len(contents) > MAX_FILE_SIZE:
-            raise HTTPException(status_code=400, detail="❌ File size exceeds 20MB limit.")
-        with open(temp_input_path, "wb") as buffer:
-            buffer.write(contents)
+        temp_input_path = save_bytes(UPLOADS, input_filename, contents)
         logger.info(f"📥 Uploaded file saved: {temp_input_path.name}")
     except Exception as e:
         logger.error(f"❌ Failed to save uploaded file: {e}")
         raise HTTPException(status_code=500, detail="Failed to save uploaded file.")
 
+    output_path: Path | None = None
     try:
-        output_path = handle_conversion_to_format(temp_input_path, target_format)
+        output_path = await run_in_threadpool(handle_conversion_to_format, temp_input_path, target_format)
 
         if not output_path or not output_path.exists():
             raise HTTPException(status_code=500, detail="❌ Conversion failed.")
 
         logger.info(f"✅ File converted successfully: {output_path.name}")
-        background_tasks.add_task(cleanup_files, [temp_input_path, output_path])
+        track(output_path)
+        # The output is streamed after we return; delete it once the response is sent
+        background_tasks.add_task(release, output_path)
 
         return FileResponse(
             path=output_path,
@@ -73,5 +66,13 @@ async def convert_document(
         )
 
     except Exception as e:
+        if output_path is not None:
+            release(output_path)
+        if isinstance(e, HTTPException):
+            raise
         logger.error(f"❌ Conversion error: {e}")
-        raise HTTPException(status_code=500, detail="Internal server error during conversion.")
\ No newline at end of file
+        raise HTTPException(status_code=500, detail="Internal server error during conversion.")
+
+    finally:
+        # The input is never needed after conversion, whether it succeeded or not
+        release(temp_input_path)
\ No newline at end of file
@@ -1,5 +1,10 @@
 from fastapi import APIRouter
 from app.models.schemas import StandardResponse
+from app.services.openai_client import breaker_status
+from app.services.storage_service import storage_stats
+from app.services.admission_service import admission_status
+from app.services.embedding_batcher import batcher_stats
+from app.services.ocr_engine import ocr_engine_stats
 
 router = APIRouter()
 
@@ -17,4 +22,75 @@ async def health_check():
             "version": "1.0.0",
             "description": "AI Document Research & Conversion API is healthy and operational."
         }
+    }
+
+
+@router.get(
+    "/openai",
+    tags=["Health"],
+    summary="Circuit breaker state for OpenAI embeddings and chat",
+    response_model=StandardResponse
+)
+async def openai_health():
+    status = breaker_status()
+    degraded = any(b["state"] != "closed" for b in status.values())
+    return {
+        "message": "⚠️ OpenAI degraded — serving local fallbacks." if degraded else "✅ OpenAI circuits closed.",
+        "data": status
+    }
+
+
+@router.get(
+    "/storage",
+    tags=["Health"],
+    summary="Disk usage and last sweep of uploads, processed and converted files",
+    response_model=StandardResponse
+)
+async def storage_health():
+    stats = storage_stats()
+    over_quota = stats["used_bytes"] > stats["quota_bytes"]
+    return {
+        "message": "⚠️ Storage over quota — sweep pending." if over_quota else "✅ Storage within quota.",
+        "data": stats
+    }
+
+
+@router.get(
+    "/admission",
+    tags=["Health"],
+    summary="Active requests, queue depths and rejections per endpoint class",
+    response_model=StandardResponse
+)
+async def admission_health():
+    status = admission_status()
+    saturated = [name for name, gate in status.items() if gate["queued"]]
+    return {
+        "message": f"⚠️ Requests queued for: {', '.join(saturated)}." if saturated else "✅ No requests queued.",
+        "data": status
+    }
+
+
+@router.get(
+    "/embeddings",
+    tags=["Health"],
+    summary="Query-embedding micro-batching: batch sizes, dedup and queue wait",
+    response_model=StandardResponse
+)
+async def embeddings_health():
+    return {
+        "message": "✅ Query embedding batchers.",
+        "data": {"batchers": batcher_stats()}
+    }
+
+
+@router.get(
+    "/ocr",
+    tags=["Health"],
+    summary="OCR engine in use, pool size and images OCR'd per second",
+    response_model=StandardResponse
+)
+async def ocr_health():
+    return {
+        "message": "✅ OCR engine.",
+        "data": ocr_engine_stats()
     }
\ No newline at end of file
@@ -1,10 +1,11 @@
 from fastapi import APIRouter, UploadFile, File, HTTPException
+from fastapi.concurrency import run_in_threadpool
 from pathlib import Path
 import uuid
 import logging
 
 from app.services.doc_service import handle_uploaded_file
-from app.config.settings import settings
+from app.services.storage_service import UPLOADS, save_bytes
 from app.models.schemas import StandardResponse, ErrorResponse
 
 router = APIRouter()
@@ -29,19 +30,17 @@ async def upload_document(file: UploadFile = File(...)):
         raise HTTPException(status_code=400, detail=f"❌ Unsupported file type: {ext}")
 
     filename = f"{Path(file.filename).stem}_{uuid.uuid4().hex}{ext}"
-    file_path = settings.upload_dir / filename
 
     try:
         contents = await file.read()
-        with open(file_path, "wb") as f:
-            f.write(contents)
+        file_path = save_bytes(UPLOADS, filename, contents)
         logger.info(f"📁 Uploaded file saved: {file_path}")
     except Exception as e:
         logger.error(f"❌ Failed to save file: {e}")
         raise HTTPException(status_code=500, detail=f"❌ Failed to save file: {e}")
 
     try:
-        extracted_text = handle_uploaded_file(file_path)
+        extracted_text = await run_in_threadpool(handle_uploaded_file, file_path)
         return {
             "message": "✅ File uploaded and processed.",
             "data": {
@@ -22,22 +22,125 @@ class Settings(BaseSettings):
     processed_dir: Path = Field(default=BASE_DIR / "data" / "processed")
     doc_store_path: Path = Field(default=BASE_DIR / "data" / "doc_store.txt")
 
+    # ==== STORAGE QUOTAS (uploads, processed, converted) ====
+    # Files are spread over this many levels of hashed subdirectories
+    storage_fanout_levels: int = 2
+    storage_ttl_hours: float = 24.0
+    storage_max_bytes: int = 2 * 1024 ** 3
+    # Over quota, least-recently-used files are evicted down to this fraction of storage_max_bytes
+    storage_low_watermark: float = 0.9
+    storage_sweep_interval_seconds: float = 300.0
+    # Files younger than this are never evicted (a request may still be using them)
+    storage_min_age_seconds: float = 60.0
+
     # ==== OPENAI API ====
     openai_api_key: str = Field(..., min_length=20, description="Must be set in .env")
+    openai_connect_timeout_seconds: float = 5.0
+    openai_embedding_timeout_seconds: float = 15.0
+    openai_chat_timeout_seconds: float = 45.0
+    openai_max_retries: int = 1
+    openai_max_connections: int = 20
+    openai_max_keepalive_connections: int = 10
+
+    # ==== OPENAI CIRCUIT BREAKER ====
+    breaker_failure_threshold: int = 5
+    breaker_cooldown_seconds: float = 30.0
+
+    # ==== EMBEDDINGS ====
+    # offline_mode: local MiniLM embeddings + local summaries, no OpenAI traffic
+    offline_mode: bool = False
+    openai_embedding_model: str = "text-embedding-ada-002"
+    local_embedding_model: str = "all-MiniLM-L6-v2"
+    embedding_batch_size: int = 100
+    local_embedding_batch_size: int = 64
+    embedding_fallback_to_local: bool = True
+    # Concurrent search queries are embedded together: wait up to query_batch_wait_ms
+    # for up to query_batch_max_size queries, then make one encode / API call
+    query_batching: bool = True
+    query_batch_wait_ms: float = 5.0
+    query_batch_max_size: int = 32
+    query_batch_openai_workers: int = 4
 
     # ==== VECTOR INDEX PATHS ====
     vector_index_path: Path = Field(default=BASE_DIR / "data" / "vector_index.index")
     vector_metadata_path: Path = Field(default=BASE_DIR / "data" / "vector_metadata.json")
+    vector_index_info_path: Path = Field(default=BASE_DIR / "data" / "vector_index_info.json")
+    vector_exact_store_path: Path = Field(default=BASE_DIR / "data" / "vector_store_f32.npy")
+    vector_minhash_path: Path = Field(default=BASE_DIR / "data" / "vector_minhash.npy")
+    vector_duplicates_path: Path = Field(default=BASE_DIR / "data" / "vector_duplicates.json")
+
+    # ==== VECTOR STORAGE ====
+    # flat (float32) | fp16 | sq8 (int8) | pq (product quantization)
+    vector_storage: str = "flat"
+    pq_subquantizers: int = 0  # 0 = dim // 16
+    pq_bits: int = 8
+    # Re-rank compressed-index candidates with exact float32 vectors memory-mapped from disk
+    rerank_exact: bool = True
+    rerank_candidates_factor: int = 4
+
+    # ==== NEAR-DUPLICATE DETECTION (MinHash/LSH) ====
+    dedup_enabled: bool = True
+    # Estimated Jaccard similarity of word shingles at which two documents count as duplicates
+    dedup_threshold: float = 0.85
+    dedup_shingle_words: int = 5
+    dedup_num_perm: int = 128
+    # Over-fetch so collapsed duplicates can be replaced in the top-k
+    dedup_search_candidates_factor: int = 3
+
+    # ==== AI ANSWER CONTEXT ====
+    context_token_budget: int = 3000
+    context_passage_tokens: int = 200
+    context_max_tokens_per_doc: int = 1000
+    context_dedup_threshold: float = 0.8
+    answer_max_tokens: int = 500
+
+    # ==== BATCH SEARCH ====
+    batch_search_max_queries: int = 100
+    batch_answer_concurrency: int = 4
+
+    # ==== ADMISSION CONTROL ====
+    # Per endpoint class: concurrent requests, queued requests, max seconds queued (then 429)
+    admission_control: bool = True
+    heavy_concurrency: int = 0  # conversions + upload OCR; 0 = half the CPU cores
+    heavy_queue_size: int = 16
+    heavy_queue_timeout_seconds: float = 30.0
+    index_concurrency: int = 1
+    index_queue_size: int = 4
+    index_queue_timeout_seconds: float = 60.0
+    search_concurrency: int = 16
+    search_queue_size: int = 128
+    search_queue_timeout_seconds: float = 5.0
 
     # ==== LOGGING ====
     log_level: str = "INFO"
     log_file: str = "logs/app.log"
+    # Fraction of requests written as JSON lines to request_log_file (0 disables)
+    request_log_sample_rate: float = 0.0
+    request_log_file: str = "logs/requests.log"
 
     # ==== ENVIRONMENT ====
     environment: str = "development"
 
     # ==== OCR ====
     tesseract_path: str = r"C:\Program Files\Tesseract-OCR\tesseract.exe"
+    ocr_preprocess: bool = True
+    ocr_target_dpi: int = 300
+    # Used when an image carries no DPI: its longest side is taken to span this many inches
+    ocr_assumed_page_inches: float = 11.0
+    # DPI metadata implying a longer side than this is ignored (treated as unknown)
+    ocr_max_page_inches: float = 14.0
+    ocr_max_upscale: float = 2.0
+    ocr_binarize: bool = True
+    ocr_detect_orientation: bool = False
+    # auto (tesserocr if installed, else pytesseract) | tesserocr | pytesseract
+    ocr_engine: str = "auto"
+    ocr_lang: str = "eng"
+    ocr_pool_size: int = 2
+    ocr_batch_size: int = 8
+    # OCR PDFs that have no text layer (off by default: up to ocr_pdf_max_pages
+    # pages per PDF can add tens of seconds to upload and indexing requests)
+    ocr_scanned_pdfs: bool = False
+    ocr_pdf_max_pages: int = 50
 
     # ==== Limits & Validation ====
     max_upload_size_mb: int = 20
@@ -1,5 +1,8 @@
+import atexit
+import json
 import logging
-from logging.handlers import RotatingFileHandler
+import queue
+from logging.handlers import QueueHandler, QueueListener, RotatingFileHandler
 from pathlib import Path
 from app.config.settings import settings
 
@@ -11,28 +14,118 @@ log_level = (settings.log_level or "INFO").upper()
 log_dir = Path(log_file).parent
 log_dir.mkdir(parents=True, exist_ok=True)
 
+REQUEST_LOGGER_NAME = "app.requests"
+
+_listener: QueueListener | None = None
+_queue_handler: QueueHandler | None = None
+
+
+class JsonFormatter(logging.Formatter):
+    """One JSON object per line; the ``request`` extra is inlined as fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        payload.update(getattr(record, "request", {}))
+        return json.dumps(payload, ensure_ascii=False)
+
+
+class _OnlyLogger(logging.Filter):
+    def __init__(self, name: str, include: bool):
+        super().__init__()
+        self.prefix = name
+        self.include = include
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        return record.name.startswith(self.prefix) == self.include
+
+
 def setup_logging():
+    """
+    Route every log record through an in-memory queue.
+
+    Request-path code only enqueues records (QueueHandler); a background
+    QueueListener thread does the formatting, file writes and rotation.
+    Safe to call more than once: later calls are no-ops.
+    """
+    global _listener, _queue_handler
+    if _listener is not None:
+        return
+
     log_formatter = logging.Formatter("%(asctime)s - %(name)s - %(levelname)s - %(message)s")
+    not_requests = _OnlyLogger(REQUEST_LOGGER_NAME, include=False)
 
     # ✅ File handler (rotates after 5MB, keeps 3 backups)
     file_handler = RotatingFileHandler(
         filename=log_file,
         maxBytes=5 * 1024 * 1024,  # 5MB
-        backupCount=3
+        backupCount=3,
+        encoding="utf-8"
     )
     file_handler.setFormatter(log_formatter)
     file_handler.setLevel(log_level)
+    file_handler.addFilter(not_requests)
 
     # ✅ Console handler
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(log_formatter)
     console_handler.setLevel(log_level)
+    console_handler.addFilter(not_requests)
 
-    # ✅ Root logger setup
-    logging.basicConfig(
-        level=log_level,
-        handlers=[file_handler, console_handler]
-    )
+    handlers: list[logging.Handler] = [file_handler, console_handler]
+
+    # ✅ Sampled JSON request log (separate file)
+    if settings.request_log_sample_rate > 0:
+        request_log_path = Path(settings.request_log_file)
+        request_log_path.parent.mkdir(parents=True, exist_ok=True)
+        request_handler = RotatingFileHandler(
+            filename=request_log_path,
+            maxBytes=5 * 1024 * 1024,
+            backupCount=3,
+            encoding="utf-8"
+        )
+        request_handler.setFormatter(JsonFormatter())
+        request_handler.addFilter(_OnlyLogger(REQUEST_LOGGER_NAME, include=True))
+        handlers.append(request_handler)
+        # Sampled request logs are wanted regardless of the app log level
+        logging.getLogger(REQUEST_LOGGER_NAME).setLevel(logging.INFO)
+
+    log_queue: queue.Queue = queue.Queue(-1)
+    _listener = QueueListener(log_queue, *handlers, respect_handler_level=True)
+    _listener.start()
+    atexit.register(stop_logging)
+
+    # ✅ Root logger setup (replaces anything configured before us)
+    root = logging.getLogger()
+    for handler in root.handlers[:]:
+        root.removeHandler(handler)
+    _queue_handler = QueueHandler(log_queue)
+    root.addHandler(_queue_handler)
+    root.setLevel(log_level)
 
     # ✅ Avoid duplicate uvicorn error logs
-    logging.getLogger("uvicorn.error").handlers = []
\ No newline at end of file
+    logging.getLogger("uvicorn.error").handlers = []
+
+
+def stop_logging():
+    """
+    Flush queued records and stop the listener thread.
+
+    The listener's handlers are attached to the root logger first, so
+    records logged after shutdown (atexit hooks, late threads) are written
+    directly instead of being queued for a listener that is gone.
+    """
+    global _listener, _queue_handler
+    if _listener is None:
+        return
+    root = logging.getLogger()
+    root.removeHandler(_queue_handler)
+    for handler in _listener.handlers:
+        root.addHandler(handler)
+    _listener.stop()
+    _listener = None
+    _queue_handler = None
\ No newline at end of file
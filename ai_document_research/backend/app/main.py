@@ -2,8 +2,11 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
 from app.config.settings import settings
-from app.logging.logging_config import setup_logging
+from app.logging.logging_config import setup_logging, stop_logging
+from app.middlewares.admission import admission_control
 from app.middlewares.custom_header import add_custom_header
+from app.middlewares.request_logging import log_requests
+from app.services.storage_service import start_sweeper, stop_sweeper
 from app.api.routes import router as api_router  # centralized router
 
 # 🔧 Setup Logging
@@ -18,6 +21,9 @@ app = FastAPI(
     redoc_url="/redoc",
 )
 
+# 🚦 Admission control (registered first so it runs inside CORS and its 429s keep CORS headers)
+app.middleware("http")(admission_control)
+
 # 🌐 CORS Middleware
 app.add_middleware(
     CORSMiddleware,
@@ -30,5 +36,17 @@ app.add_middleware(
 # 🧾 Custom Middleware: Add custom headers
 app.middleware("http")(add_custom_header)
 
+# 📝 Sampled structured request logs (not installed at the default rate of 0,
+# so unsampled deployments pay no extra middleware layer)
+if settings.request_log_sample_rate > 0:
+    app.middleware("http")(log_requests)
+
+# 🗑️ Background TTL/quota sweeper for uploaded and generated files
+app.add_event_handler("startup", start_sweeper)
+app.add_event_handler("shutdown", stop_sweeper)
+
+# 🧹 Flush queued log records on shutdown
+app.add_event_handler("shutdown", stop_logging)
+
 # 🔌 Include All API Routes from `api/__init__.py`
 app.include_router(api_router, prefix="/api")
\ No newline at end of file
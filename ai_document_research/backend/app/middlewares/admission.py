@@ -0,0 +1,33 @@
+from fastapi import Request
+from fastapi.responses import JSONResponse
+import logging
+import time
+
+from app.config.settings import settings
+from app.services.admission_service import AdmissionRejected, endpoint_class_for, gates
+
+logger = logging.getLogger(__name__)
+
+# Middleware that holds an admission slot for the whole request. It runs before
+# FastAPI parses the body, so a rejected upload is never read or spooled to disk.
+async def admission_control(request: Request, call_next):
+    endpoint_class = endpoint_class_for(request.method, request.url.path)
+    if endpoint_class is None or not settings.admission_control:
+        return await call_next(request)
+
+    gate = gates[endpoint_class]
+    try:
+        await gate.acquire()
+    except AdmissionRejected as e:
+        logger.warning(f"🚦 Rejected {endpoint_class} request ({e.reason}); retry after {e.retry_after}s.")
+        return JSONResponse(
+            status_code=429,
+            content={"detail": f"❌ Server busy ({endpoint_class}: {e.reason}). Retry later."},
+            headers={"Retry-After": str(e.retry_after)}
+        )
+
+    start = time.perf_counter()
+    try:
+        return await call_next(request)
+    finally:
+        gate.release(time.perf_counter() - start)
@@ -0,0 +1,31 @@
+from fastapi import Request
+from fastapi.responses import Response
+import logging
+import random
+import time
+
+from app.config.settings import settings
+from app.logging.logging_config import REQUEST_LOGGER_NAME
+
+request_logger = logging.getLogger(REQUEST_LOGGER_NAME)
+
+# Middleware to write a sampled, structured (JSON) log line per request
+# (installed only when REQUEST_LOG_SAMPLE_RATE > 0)
+async def log_requests(request: Request, call_next):
+    if random.random() >= settings.request_log_sample_rate:
+        return await call_next(request)
+
+    start = time.perf_counter()
+    status_code = 500
+    try:
+        response: Response = await call_next(request)
+        status_code = response.status_code
+        return response
+    finally:
+        request_logger.info("request", extra={"request": {
+            "method": request.method,
+            "path": request.url.path,
+            "status": status_code,
+            "duration_ms": round((time.perf_counter() - start) * 1000, 2),
+            "client": request.client.host if request.client else None,
+        }})
@@ -47,9 +47,60 @@ class ErrorResponse(BaseModel):
     detail: str = Field(..., description="Detailed error message or reason.")
 
 
+class SearchMatch(BaseModel):
+    """
+    A single document matched by a vector search.
+    """
+    rank: int = Field(..., description="1-based rank of the match.")
+    score: float = Field(..., description="L2 distance to the query (lower is closer).")
+    metadata: str = Field(..., description="Metadata identifier of the matched document.")
+    text: str = Field(..., description="Stored text of the matched document.")
+    duplicates: List[str] = Field(
+        default_factory=list,
+        description="Metadata of near-duplicate documents collapsed into this match."
+    )
+
+
 class AIResearchResponse(BaseModel):
     """
     Response structure for AI-powered document research.
     """
-    matches: List[str] = Field(..., description="Top similar document matches from FAISS index.")
-    answer: str = Field(..., description="OpenAI-generated summary or answer based on matched documents.")
\ No newline at end of file
+    matches: List[SearchMatch] = Field(..., description="Top similar document matches from FAISS index.")
+    answer: str = Field(..., description="OpenAI-generated summary or answer based on matched documents.")
+
+
+class BatchSearchRequest(BaseModel):
+    """
+    Schema for searching many queries in one request.
+    """
+    queries: List[str] = Field(
+        ...,
+        min_length=1,
+        description="Search query strings."
+    )
+    top_k: int = Field(
+        default=5,
+        gt=0,
+        le=20,
+        description="Top-K similar results to return per query."
+    )
+    include_answers: bool = Field(
+        default=False,
+        description="Also generate an AI answer for every query (slower)."
+    )
+
+
+class BatchSearchResult(BaseModel):
+    """
+    Matches (and optional answer) for one query of a batch search.
+    """
+    query: str = Field(..., description="The query these results belong to.")
+    matches: List[SearchMatch] = Field(..., description="Top similar document matches from FAISS index.")
+    answer: Optional[str] = Field(default=None, description="AI answer, when requested.")
+
+
+class BatchSearchResponse(BaseModel):
+    """
+    Response structure for batch search, one entry per query in request order.
+    """
+    results: List[BatchSearchResult] = Field(..., description="Per-query search results.")
\ No newline at end of file
@@ -0,0 +1,156 @@
+from collections import deque
+from typing import Dict, Optional
+import asyncio
+import math
+import os
+import time
+from app.config.settings import settings
+
+# Endpoint classes
+HEAVY = "heavy"    # conversions and upload + OCR
+INDEX = "index"    # index builds
+SEARCH = "search"  # search (cheap, latency-sensitive)
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, gate: "AdmissionGate", reason: str):
+        super().__init__(f"{gate.name}: {reason}")
+        self.reason = reason
+        self.retry_after = gate.retry_after()
+
+
+# ======================================
+# ✅ Concurrency Gate with Bounded FIFO Queue
+# ======================================
+class AdmissionGate:
+    """
+    At most ``concurrency`` requests run at once; up to ``queue_size`` more
+    wait in FIFO order for at most ``queue_timeout`` seconds. Anything beyond
+    that is rejected straight away so the client can back off.
+
+    All state is touched from the event loop only, so no locking is needed.
+    """
+
+    def __init__(self, name: str, concurrency: int, queue_size: int, queue_timeout: float):
+        self.name = name
+        self.concurrency = max(1, concurrency)
+        self.queue_size = max(0, queue_size)
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self._waiters: deque = deque()
+        self.admitted = 0
+        self.rejected_full = 0
+        self.rejected_timeout = 0
+        # Exponentially weighted averages, used for Retry-After
+        self.avg_service_seconds = 0.0
+        self.avg_wait_seconds = 0.0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    async def acquire(self) -> float:
+        """Wait for a slot; returns the seconds spent queued."""
+        if self.active < self.concurrency and not self._waiters:
+            self.active += 1
+            self.admitted += 1
+            return 0.0
+
+        if len(self._waiters) >= self.queue_size:
+            self.rejected_full += 1
+            raise AdmissionRejected(self, "queue full")
+
+        start = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, self.queue_timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up: pass it on
+                self.release()
+            else:
+                try:
+                    self._waiters.remove(waiter)
+                except ValueError:
+                    pass
+            if isinstance(e, asyncio.TimeoutError):
+                self.rejected_timeout += 1
+                raise AdmissionRejected(self, "queue timeout")
+            raise
+
+        waited = time.perf_counter() - start
+        self.avg_wait_seconds = _ewma(self.avg_wait_seconds, waited)
+        self.admitted += 1
+        return waited
+
+    def release(self, service_seconds: float | None = None) -> None:
+        if service_seconds is not None:
+            self.avg_service_seconds = _ewma(self.avg_service_seconds, service_seconds)
+        # Hand the slot straight to the next live waiter, keeping FIFO order
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def retry_after(self) -> int:
+        """Seconds until the current queue has likely drained (at least 1)."""
+        service = self.avg_service_seconds or 1.0
+        return max(1, math.ceil(service * (self.queued + 1) / self.concurrency))
+
+    def snapshot(self) -> Dict:
+        return {
+            "active": self.active,
+            "queued": self.queued,
+            "concurrency": self.concurrency,
+            "queue_size": self.queue_size,
+            "queue_timeout_seconds": self.queue_timeout,
+            "admitted": self.admitted,
+            "rejected_queue_full": self.rejected_full,
+            "rejected_queue_timeout": self.rejected_timeout,
+            "avg_service_ms": round(self.avg_service_seconds * 1000.0, 1),
+            "avg_queue_wait_ms": round(self.avg_wait_seconds * 1000.0, 1),
+        }
+
+
+def _ewma(current: float, sample: float, alpha: float = 0.2) -> float:
+    return sample if current == 0.0 else current + alpha * (sample - current)
+
+
+def _default_heavy_concurrency() -> int:
+    return settings.heavy_concurrency or max(1, (os.cpu_count() or 2) // 2)
+
+
+gates: Dict[str, AdmissionGate] = {
+    HEAVY: AdmissionGate(HEAVY, _default_heavy_concurrency(),
+                         settings.heavy_queue_size, settings.heavy_queue_timeout_seconds),
+    INDEX: AdmissionGate(INDEX, settings.index_concurrency,
+                         settings.index_queue_size, settings.index_queue_timeout_seconds),
+    SEARCH: AdmissionGate(SEARCH, settings.search_concurrency,
+                          settings.search_queue_size, settings.search_queue_timeout_seconds),
+}
+
+
+# ======================================
+# ✅ Endpoint Classes by Path
+# ======================================
+# Matched by path prefix in the admission middleware, before the body is read
+GATED_PATHS = (
+    ("/api/upload", HEAVY),
+    ("/api/convert", HEAVY),
+    ("/api/ai/build-index", INDEX),
+    ("/api/ai/index-files", INDEX),
+    ("/api/ai/search", SEARCH),  # /search, /search-body, /search-batch
+)
+
+
+def endpoint_class_for(method: str, path: str) -> Optional[str]:
+    if method == "OPTIONS":
+        return None  # CORS preflight
+    return next((endpoint_class for prefix, endpoint_class in GATED_PATHS if path.startswith(prefix)), None)
+
+
+def admission_status() -> Dict:
+    return {name: gate.snapshot() for name, gate in gates.items()}
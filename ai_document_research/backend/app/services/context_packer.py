@@ -0,0 +1,153 @@
+from typing import List, Set, Tuple
+import math
+import re
+import logging
+
+try:
+    import tiktoken
+except ImportError:  # optional — fall back to a character-based estimate
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r"\w+")
+SENTENCE_SPLIT_RE = re.compile(r"(?<=[.!?])\s+")
+SHINGLE_SIZE = 3
+
+_encoding = None
+
+
+def _get_encoding():
+    global _encoding
+    if _encoding is None and tiktoken is not None:
+        try:
+            _encoding = tiktoken.get_encoding("cl100k_base")
+        except Exception as e:
+            logger.warning(f"⚠️ tiktoken unavailable ({e}); estimating token counts.")
+    return _encoding
+
+
+# ======================================
+# ✅ Token Counting
+# ======================================
+def count_tokens(text: str) -> int:
+    encoding = _get_encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    # ~4 characters per token for English text
+    return math.ceil(len(text) / 4)
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    if max_tokens <= 0:
+        return ""
+    encoding = _get_encoding()
+    if encoding is not None:
+        tokens = encoding.encode(text, disallowed_special=())
+        return text if len(tokens) <= max_tokens else encoding.decode(tokens[:max_tokens])
+    return text[:max_tokens * 4]
+
+
+# ======================================
+# ✅ Passages
+# ======================================
+def split_passages(text: str, passage_tokens: int) -> List[str]:
+    """Group sentences into passages of at most ``passage_tokens`` tokens."""
+    passages, current, current_tokens = [], [], 0
+    for sentence in SENTENCE_SPLIT_RE.split(text.strip()):
+        if not sentence:
+            continue
+        tokens = count_tokens(sentence)
+        if tokens > passage_tokens:
+            # A run-on "sentence" (tables, OCR output) is cut by words instead
+            words = sentence.split()
+            step = max(1, len(words) * passage_tokens // tokens)
+            pieces = [" ".join(words[i:i + step]) for i in range(0, len(words), step)]
+        else:
+            pieces = [sentence]
+
+        for piece in pieces:
+            piece_tokens = count_tokens(piece)
+            if current and current_tokens + piece_tokens > passage_tokens:
+                passages.append(" ".join(current))
+                current, current_tokens = [], 0
+            current.append(piece)
+            current_tokens += piece_tokens
+    if current:
+        passages.append(" ".join(current))
+    return passages
+
+
+def _terms(text: str) -> List[str]:
+    return [w for w in WORD_RE.findall(text.lower()) if len(w) > 2]
+
+
+def relevance(passage: str, query_terms: Set[str]) -> float:
+    """Distinct query terms matched, with a small bonus for repeated hits."""
+    if not query_terms:
+        return 0.0
+    words = _terms(passage)
+    hits = [w for w in words if w in query_terms]
+    return len(set(hits)) + 0.1 * len(hits) / math.sqrt(len(words) or 1)
+
+
+def _shingles(text: str) -> Set[Tuple[str, ...]]:
+    words = WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        return {tuple(words)}
+    return {tuple(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)}
+
+
+def _jaccard(a: Set, b: Set) -> float:
+    if not a or not b:
+        return 0.0
+    return len(a & b) / len(a | b)
+
+
+# ======================================
+# ✅ Context Packer
+# ======================================
+def pack_context(query: str, docs: List[str], token_budget: int, passage_tokens: int,
+                 max_tokens_per_doc: int, dedup_threshold: float) -> List[str]:
+    """
+    Choose the passages to put in the prompt.
+
+    Documents are visited in rank order. Each contributes its passages most
+    relevant to the query (up to ``max_tokens_per_doc``, kept in document
+    order), skipping any passage that is a near-duplicate of one already
+    chosen, until ``token_budget`` is spent.
+    """
+    query_terms = set(_terms(query))
+    selected: List[str] = []
+    selected_shingles: List[Set] = []
+    remaining = token_budget
+
+    for doc in docs:
+        if remaining <= 0:
+            break
+
+        passages = split_passages(doc, passage_tokens)
+        ranked = sorted(range(len(passages)), key=lambda i: relevance(passages[i], query_terms), reverse=True)
+
+        doc_budget = min(max_tokens_per_doc, remaining)
+        chosen = []
+        for i in ranked:
+            if doc_budget <= 0:
+                break
+            passage = passages[i]
+            shingles = _shingles(passage)
+            if any(_jaccard(shingles, seen) >= dedup_threshold for seen in selected_shingles):
+                continue
+
+            tokens = count_tokens(passage)
+            if tokens > doc_budget:
+                passage = truncate_to_tokens(passage, doc_budget)
+                tokens = count_tokens(passage)
+            chosen.append((i, passage))
+            selected_shingles.append(shingles)
+            doc_budget -= tokens
+            remaining -= tokens
+
+        selected.extend(passage for _, passage in sorted(chosen))
+
+    return selected
@@ -4,18 +4,14 @@ from docx import Document
 from fpdf import FPDF
 from pdf2image import convert_from_path
 from PyPDF2 import PdfReader
-from pytesseract import image_to_string
 import uuid
 import logging
+from app.services.ocr_service import ocr_image
+from app.services.docx_reader import iter_docx_text
+from app.services.storage_service import CONVERTED, storage_path, release
 
 # Logger setup
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
-
-# Directories
-BASE_DIR = Path(__file__).resolve().parent.parent.parent
-OUTPUT_DIR = BASE_DIR / "app" / "data" / "converted"
-OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
 def handle_conversion_to_format(file_path: Path, target_format: str) -> Path | None:
     ext = file_path.suffix.lower()
@@ -29,7 +25,10 @@ def handle_conversion_to_format(file_path: Path, target_format: str) -> Path | N
 
         elif ext == ".pdf":
             if target_format == "jpg":
-                return convert_pdf_to_images(file_path)[0]
+                first_page, *other_pages = convert_pdf_to_images(file_path)
+                # Only the first page is returned (and tracked); the rest never counted
+                release(*other_pages, tracked=False)
+                return first_page
             elif target_format == "txt":
                 return convert_pdf_to_txt(file_path)
             elif target_format == "docx":
@@ -51,7 +50,7 @@ def handle_conversion_to_format(file_path: Path, target_format: str) -> Path | N
 def convert_image(file_path: Path, to_format: str) -> Path:
     try:
         with Image.open(file_path) as img:
-            output_file = OUTPUT_DIR / f"{file_path.stem}_{uuid.uuid4().hex}.{to_format}"
+            output_file = storage_path(CONVERTED, f"{file_path.stem}_{uuid.uuid4().hex}.{to_format}")
             rgb_img = img.convert("RGB") if to_format in ["pdf", "jpg"] else img
             rgb_img.save(str(output_file), format=to_format.upper())
             logger.info(f"✅ Image converted to {to_format.upper()}: {output_file.name}")
@@ -65,10 +64,9 @@ def convert_image(file_path: Path, to_format: str) -> Path:
 
 def convert_image_to_text(file_path: Path) -> Path:
     try:
-        with Image.open(file_path) as img:
-            text = image_to_string(img)
+        text = ocr_image(file_path)
 
-        output_file = OUTPUT_DIR / f"{file_path.stem}_{uuid.uuid4().hex}.txt"
+        output_file = storage_path(CONVERTED, f"{file_path.stem}_{uuid.uuid4().hex}.txt")
         output_file.write_text(text.strip(), encoding="utf-8")
         logger.info(f"✅ OCR text saved: {output_file.name}")
         return output_file
@@ -82,7 +80,7 @@ def convert_pdf_to_images(file_path: Path) -> list[Path]:
         output_files = []
 
         for i, image in enumerate(images):
-            out_path = OUTPUT_DIR / f"{file_path.stem}_page{i+1}.jpg"
+            out_path = storage_path(CONVERTED, f"{file_path.stem}_page{i+1}.jpg")
             image.save(str(out_path), "JPEG")
             output_files.append(out_path)
 
@@ -96,7 +94,7 @@ def convert_pdf_to_txt(file_path: Path) -> Path:
     try:
         reader = PdfReader(str(file_path))
         text = "".join(page.extract_text() or "" for page in reader.pages).strip()
-        output_file = OUTPUT_DIR / f"{file_path.stem}_{uuid.uuid4().hex}.txt"
+        output_file = storage_path(CONVERTED, f"{file_path.stem}_{uuid.uuid4().hex}.txt")
         output_file.write_text(text, encoding="utf-8")
         logger.info(f"✅ PDF to TXT success: {output_file.name}")
         return output_file
@@ -113,7 +111,7 @@ def convert_pdf_to_docx(file_path: Path) -> Path:
             if text:
                 doc.add_paragraph(text.strip())
 
-        output_file = OUTPUT_DIR / f"{file_path.stem}_{uuid.uuid4().hex}.docx"
+        output_file = storage_path(CONVERTED, f"{file_path.stem}_{uuid.uuid4().hex}.docx")
         doc.save(str(output_file))
         logger.info(f"✅ PDF to DOCX success: {output_file.name}")
         return output_file
@@ -123,7 +121,6 @@ def convert_pdf_to_docx(file_path: Path) -> Path:
 
 def convert_docx_to_pdf(file_path: Path) -> Path:
     try:
-        doc = Document(str(file_path))
         pdf = FPDF(format='A4')
         pdf.add_page()
         pdf.set_auto_page_break(auto=True, margin=15)
@@ -131,12 +128,11 @@ def convert_docx_to_pdf(file_path: Path) -> Path:
         pdf.set_left_margin(10)
         pdf.set_right_margin(10)
 
-        for para in doc.paragraphs:
-            text = para.text.strip()
-            if text:
-                pdf.multi_cell(0, 10, text)
+        for text in iter_docx_text(file_path):
+            # Return to the left margin after each block (fpdf2 defaults to the right edge)
+            pdf.multi_cell(0, 10, text, new_x="LMARGIN", new_y="NEXT")
 
-        output_file = OUTPUT_DIR / f"{file_path.stem}_{uuid.uuid4().hex}.pdf"
+        output_file = storage_path(CONVERTED, f"{file_path.stem}_{uuid.uuid4().hex}.pdf")
         pdf.output(str(output_file))
         logger.info(f"✅ DOCX to PDF success: {output_file.name}")
         return output_file
@@ -158,9 +154,9 @@ def convert_txt_to_pdf(file_path: Path) -> Path:
         for line in lines:
             clean = line.strip()
             if clean:
-                pdf.multi_cell(0, 10, clean)
+                pdf.multi_cell(0, 10, clean, new_x="LMARGIN", new_y="NEXT")
 
-        output_file = OUTPUT_DIR / f"{file_path.stem}_{uuid.uuid4().hex}.pdf"
+        output_file = storage_path(CONVERTED, f"{file_path.stem}_{uuid.uuid4().hex}.pdf")
         pdf.output(str(output_file))
         logger.info(f"✅ TXT to PDF success: {output_file.name}")
         return output_file
@@ -0,0 +1,176 @@
+from pathlib import Path
+from typing import Dict, Hashable, Iterable, List, Optional, Tuple
+import re
+import zlib
+import numpy as np
+
+WORD_RE = re.compile(r"\w+")
+
+# Universal hashing (a * x + b) mod p over 32-bit shingle hashes; a, b < 2**32 keep a * x + b inside uint64
+MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+MAX_HASH = np.uint64(0xFFFFFFFF)
+# Signature of a text with no words; never matched as a duplicate
+EMPTY = 0xFFFFFFFF
+# Shingles hashed per step, bounding the (num_perm x chunk) work matrix
+SHINGLE_CHUNK = 8192
+
+
+# ======================================
+# ✅ MinHash Signatures
+# ======================================
+def _permutations(num_perm: int, seed: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 32, size=num_perm, dtype=np.uint64)
+    b = rng.integers(0, 1 << 32, size=num_perm, dtype=np.uint64)
+    return a, b
+
+
+def shingle_hashes(text: str, shingle_words: int) -> np.ndarray:
+    """32-bit hashes of the distinct word k-grams of ``text`` (the whole text if it is shorter)."""
+    words = WORD_RE.findall(text.lower())
+    if not words:
+        return np.empty(0, dtype=np.uint64)
+    k = min(shingle_words, len(words))
+    shingles = {" ".join(words[i:i + k]) for i in range(len(words) - k + 1)}
+    return np.fromiter((zlib.crc32(s.encode("utf-8")) for s in shingles), dtype=np.uint64, count=len(shingles))
+
+
+def minhash_signatures(texts: Iterable[str], num_perm: int, shingle_words: int) -> np.ndarray:
+    """One ``num_perm``-wide uint32 MinHash signature per text."""
+    a, b = _permutations(num_perm)
+    rows = []
+    for text in texts:
+        hashes = shingle_hashes(text, shingle_words)
+        signature = np.full(num_perm, EMPTY, dtype=np.uint64)
+        for start in range(0, len(hashes), SHINGLE_CHUNK):
+            chunk = hashes[start:start + SHINGLE_CHUNK]
+            permuted = ((a[:, None] * chunk[None, :] + b[:, None]) % MERSENNE_PRIME) & MAX_HASH
+            np.minimum(signature, permuted.min(axis=1), out=signature)
+        rows.append(signature.astype(np.uint32))
+    if not rows:
+        return np.empty((0, num_perm), dtype=np.uint32)
+    return np.vstack(rows)
+
+
+def similarity(sig_a: np.ndarray, sig_b: np.ndarray) -> float:
+    """Estimated Jaccard similarity of the two texts' shingle sets."""
+    if sig_a[0] == EMPTY or sig_b[0] == EMPTY:
+        return 0.0
+    return float(np.count_nonzero(sig_a == sig_b)) / len(sig_a)
+
+
+# ======================================
+# ✅ LSH Banding
+# ======================================
+def lsh_bands(num_perm: int, threshold: float) -> Tuple[int, int]:
+    """
+    (bands, rows) with bands * rows == num_perm whose S-curve midpoint
+    (1 / bands) ** (1 / rows) is the highest one at or below ``threshold``.
+
+    Erring low trades a few extra candidate checks (every candidate is
+    verified against the full signature) for not missing true duplicates.
+    """
+    options = [(b, num_perm // b) for b in range(1, num_perm + 1) if num_perm % b == 0]
+    midpoint = lambda br: (1.0 / br[0]) ** (1.0 / br[1])  # noqa: E731
+    below = [br for br in options if midpoint(br) <= threshold]
+    return max(below, key=midpoint) if below else min(options, key=midpoint)
+
+
+class NearDuplicateIndex:
+    """
+    LSH buckets over canonical signatures, filled one document at a time.
+
+    ``match`` compares a signature only with canonicals sharing a band and
+    returns the key of the most similar one at or above ``threshold``;
+    ``add`` makes a signature canonical under ``key``. Signatures of texts
+    with no words neither match nor are added.
+    """
+
+    def __init__(self, num_perm: int, threshold: float):
+        self.threshold = threshold
+        self.bands, self.rows = lsh_bands(num_perm, threshold)
+        self.buckets: List[Dict[bytes, List[int]]] = [{} for _ in range(self.bands)]
+        self.signatures: List[np.ndarray] = []
+        self.keys: List[Hashable] = []
+        self.candidates_checked = 0
+
+    def _band_keys(self, signature: np.ndarray) -> List[bytes]:
+        return [signature[band * self.rows:(band + 1) * self.rows].tobytes() for band in range(self.bands)]
+
+    def match(self, signature: np.ndarray) -> Optional[Hashable]:
+        if signature[0] == EMPTY:
+            return None
+        candidates = set()
+        for band, key in enumerate(self._band_keys(signature)):
+            candidates.update(self.buckets[band].get(key, ()))
+
+        best, best_similarity = None, self.threshold
+        for j in candidates:
+            self.candidates_checked += 1
+            s = similarity(signature, self.signatures[j])
+            if s >= best_similarity:
+                best, best_similarity = j, s
+        return self.keys[best] if best is not None else None
+
+    def add(self, signature: np.ndarray, key: Hashable) -> None:
+        if signature[0] == EMPTY:
+            return
+        entry = len(self.signatures)
+        self.signatures.append(np.asarray(signature, dtype=np.uint32))
+        self.keys.append(key)
+        for band, band_key in enumerate(self._band_keys(signature)):
+            self.buckets[band].setdefault(band_key, []).append(entry)
+
+    def stats(self, documents: int, duplicates: int) -> Dict:
+        return {
+            "documents": documents,
+            "canonical": documents - duplicates,
+            "duplicates": duplicates,
+            "duplicate_ratio": round(duplicates / documents, 4) if documents else 0.0,
+            "threshold": self.threshold,
+            "lsh_bands": self.bands,
+            "lsh_rows": self.rows,
+            "candidates_checked": self.candidates_checked,
+        }
+
+
+def find_near_duplicates(signatures: np.ndarray, threshold: float) -> Tuple[List[int], Dict]:
+    """
+    Greedy, order-preserving near-duplicate detection.
+
+    Each text is compared (via LSH buckets) only with earlier canonical
+    texts; it becomes a duplicate of the most similar one at or above
+    ``threshold``, otherwise a canonical itself. Returns ``canonical_of``
+    (``canonical_of[i] == i`` for canonicals) and build statistics.
+    """
+    n, num_perm = signatures.shape
+    lsh = NearDuplicateIndex(num_perm, threshold)
+    canonical_of = list(range(n))
+
+    for i in range(n):
+        canonical = lsh.match(signatures[i])
+        if canonical is not None:
+            canonical_of[i] = canonical
+        else:
+            lsh.add(signatures[i], i)
+
+    duplicates = sum(1 for i, c in enumerate(canonical_of) if i != c)
+    return canonical_of, lsh.stats(n, duplicates)
+
+
+# ======================================
+# ✅ Persistence
+# ======================================
+def write_signatures(signatures: np.ndarray, path: Path) -> None:
+    tmp_path = path.with_name(path.name + ".tmp")
+    with tmp_path.open("wb") as f:
+        np.save(f, np.ascontiguousarray(signatures, dtype=np.uint32))
+    tmp_path.replace(path)
+
+
+def open_signatures(path: Path, rows: int) -> Optional[np.ndarray]:
+    """Memory-mapped signatures, or None when missing or out of step with the index."""
+    if not path.exists():
+        return None
+    signatures = np.load(str(path), mmap_mode="r")
+    return signatures if len(signatures) == rows else None
@@ -1,19 +1,18 @@
 from pathlib import Path
 from PyPDF2 import PdfReader
-from docx import Document
-from app.services.ocr_service import extract_text_from_image
+from app.services.docx_reader import extract_docx_text
+from app.services.ocr_service import extract_text_from_image, ocr_pdf_pages
+from app.services.storage_service import PROCESSED, storage_path, track
+from app.config.settings import settings
 import logging
 
 # Logger setup
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
 
 def extract_text_from_docx(file_path: Path) -> str:
-    """Extract text from a DOCX file."""
+    """Extract text from a DOCX file (body, tables, headers, footers and notes)."""
     try:
-        doc = Document(str(file_path))
-        paragraphs = [para.text.strip() for para in doc.paragraphs if para.text.strip()]
-        return "\n".join(paragraphs)
+        return extract_docx_text(file_path)
     except Exception as e:
         logger.error(f"❌ DOCX parsing error ({file_path.name}): {e}")
         return ""
@@ -31,31 +30,43 @@ def extract_text_from_pdf(file_path: Path) -> str:
     try:
         reader = PdfReader(str(file_path))
         text = "\n".join((page.extract_text() or "").strip() for page in reader.pages)
+        if not text.strip() and settings.ocr_scanned_pdfs:
+            logger.info(f"🖨️ No text layer in {file_path.name}; running OCR.")
+            return ocr_pdf_pages(file_path)
         return text
     except Exception as e:
         logger.error(f"❌ PDF parsing error ({file_path.name}): {e}")
         return ""
 
+IMAGE_EXTENSIONS = {".png", ".jpg", ".jpeg"}
+SUPPORTED_EXTENSIONS = {".pdf", ".docx", ".txt"} | IMAGE_EXTENSIONS
+
+def extract_text(file_path: Path) -> str:
+    """Extract text with the extractor matching the file extension."""
+    ext = file_path.suffix.lower()
+    if ext == ".pdf":
+        return extract_text_from_pdf(file_path)
+    if ext in IMAGE_EXTENSIONS:
+        return extract_text_from_image(file_path)
+    if ext == ".docx":
+        return extract_text_from_docx(file_path)
+    if ext == ".txt":
+        return extract_text_from_txt(file_path)
+    raise ValueError(f"❌ Unsupported file type: {ext}")
+
 def handle_uploaded_file(file_path: Path) -> str:
     """Detect file type, extract text, and store it in processed folder."""
     ext = file_path.suffix.lower()
-    text = ""
 
     logger.info(f"📄 Processing file: {file_path.name}")
 
-    if ext == ".pdf":
-        text = extract_text_from_pdf(file_path)
-    elif ext in {".png", ".jpg", ".jpeg"}:
-        text = extract_text_from_image(file_path)
-    elif ext == ".docx":
-        text = extract_text_from_docx(file_path)
-    elif ext == ".txt":
-        text = extract_text_from_txt(file_path)
-    else:
+    if ext not in SUPPORTED_EXTENSIONS:
         msg = f"❌ Unsupported file type: {ext}"
         logger.warning(msg)
         return msg
 
+    text = extract_text(file_path)
+
     if not text.strip():
         msg = f"⚠️ No text extracted from: {file_path.name}"
         logger.warning(msg)
@@ -63,11 +74,9 @@ def handle_uploaded_file(file_path: Path) -> str:
 
     # Save extracted text
     try:
-        output_dir = file_path.parent.parent / "processed"
-        output_dir.mkdir(parents=True, exist_ok=True)
-
-        output_file = output_dir / f"{file_path.stem}.txt"
+        output_file = storage_path(PROCESSED, f"{file_path.stem}.txt")
         output_file.write_text(text, encoding="utf-8")
+        track(output_file)
 
         logger.info(f"✅ Text extracted and saved: {output_file.name}")
         return text
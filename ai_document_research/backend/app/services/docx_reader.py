@@ -0,0 +1,138 @@
+from pathlib import Path
+from typing import BinaryIO, Iterator, List, Union
+import re
+import zipfile
+from lxml import etree
+
+DocxSource = Union[Path, str, BinaryIO]
+
+# Parts read in addition to word/document.xml, in output order
+BODY_PART = "word/document.xml"
+HEADER_RE = re.compile(r"word/header\d*\.xml$")
+FOOTER_RE = re.compile(r"word/footer\d*\.xml$")
+NOTE_PARTS = ("word/footnotes.xml", "word/endnotes.xml")
+
+# WordprocessingML namespaces (Transitional and Strict OOXML)
+W_NAMESPACES = {
+    "http://schemas.openxmlformats.org/wordprocessingml/2006/main",
+    "http://purl.oclc.org/ooxml/wordprocessingml/main",
+}
+P, R, T, TAB, BR, CR, TC, FALLBACK = "p", "r", "t", "tab", "br", "cr", "tc", "Fallback"
+
+
+def _local(tag) -> str:
+    """Local name of a WordprocessingML element ("" for other namespaces, except mc:Fallback)."""
+    if not isinstance(tag, str):
+        return ""  # comments and processing instructions
+    namespace, _, name = tag[1:].partition("}")
+    return name if namespace in W_NAMESPACES or name == FALLBACK else ""
+
+
+# ======================================
+# ✅ Streaming Part Parser
+# ======================================
+def _iter_part_blocks(stream: BinaryIO, container_depth: int) -> Iterator[str]:
+    """
+    Yield the text of each paragraph, and of each outermost table cell as a
+    whole (nested tables included), in document order.
+
+    Elements are discarded as soon as their container-level block (a body
+    paragraph or table, a header, a footnote) ends, so memory is bounded by
+    the largest single block instead of the whole document.
+    """
+    stack: List = []
+    paragraphs: List[List[str]] = []
+    cells: List[List[str]] = []
+    fallback_depth = 0
+
+    for event, elem in etree.iterparse(stream, events=("start", "end"), huge_tree=True):
+        name = _local(elem.tag)
+
+        if event == "start":
+            stack.append(elem)
+            if name == FALLBACK:
+                # mc:AlternateContent repeats text boxes in a fallback branch
+                fallback_depth += 1
+            elif fallback_depth:
+                continue
+            elif name == P:
+                paragraphs.append([])
+            elif name == TC:
+                cells.append([])
+            continue
+
+        stack.pop()
+        if name == FALLBACK:
+            fallback_depth -= 1
+        elif fallback_depth:
+            pass
+        elif name == T and paragraphs:
+            paragraphs[-1].append(elem.text or "")
+        elif name == TAB and paragraphs and _local(elem.getparent().tag) == R:
+            paragraphs[-1].append("\t")
+        elif name in (BR, CR) and paragraphs:
+            paragraphs[-1].append("\n")
+        elif name == P and paragraphs:
+            elem.clear()
+            text = "".join(paragraphs.pop()).strip()
+            if text:
+                if cells:
+                    cells[-1].append(text)
+                elif paragraphs:
+                    # Text-box paragraph nested inside another paragraph
+                    paragraphs[-1].append(" " + text)
+                else:
+                    yield text
+        elif name == TC and cells:
+            elem.clear()
+            text = "\n".join(cells.pop())
+            if text:
+                if cells:
+                    # Nested table: its cells belong to the enclosing cell, in place
+                    cells[-1].append(text)
+                else:
+                    yield text
+
+        if len(stack) == container_depth:
+            # A top-level block just ended: drop everything parsed so far
+            stack[-1].clear()
+
+
+def iter_docx_text(source: DocxSource, include_headers: bool = True, include_notes: bool = True) -> Iterator[str]:
+    """
+    Stream text blocks out of a DOCX without building the python-docx object
+    tree: headers, then body paragraphs and table cells, then footnotes,
+    endnotes and footers. Repeated header/footer text is yielded once.
+    """
+    with zipfile.ZipFile(source) as archive:
+        names = archive.namelist()
+        headers = sorted(n for n in names if HEADER_RE.match(n)) if include_headers else []
+        footers = sorted(n for n in names if FOOTER_RE.match(n)) if include_headers else []
+        notes = [n for n in NOTE_PARTS if n in names] if include_notes else []
+
+        seen_margins = set()
+
+        def margin_part(part: str) -> Iterator[str]:
+            with archive.open(part) as stream:
+                for text in _iter_part_blocks(stream, container_depth=1):
+                    if text not in seen_margins:
+                        seen_margins.add(text)
+                        yield text
+
+        for part in headers:
+            yield from margin_part(part)
+
+        with archive.open(BODY_PART) as stream:
+            # w:document > w:body > block
+            yield from _iter_part_blocks(stream, container_depth=2)
+
+        for part in notes:
+            with archive.open(part) as stream:
+                yield from _iter_part_blocks(stream, container_depth=1)
+
+        for part in footers:
+            yield from margin_part(part)
+
+
+def extract_docx_text(source: DocxSource) -> str:
+    return "\n".join(iter_docx_text(source))
@@ -0,0 +1,186 @@
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Dict, List, Tuple
+import queue
+import threading
+import time
+import logging
+import numpy as np
+from app.config.settings import settings
+from app.services.embedding_service import LOCAL_PROVIDER, EmbeddingUnavailableError
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds of the batch-size histogram buckets
+BATCH_SIZE_BUCKETS = (1, 2, 4, 8, 16, 32, 64)
+
+
+class EmbeddingTimeoutError(EmbeddingUnavailableError):
+    """Raised when a queued query is not embedded in time (stuck call or dead batcher thread)."""
+
+
+def result_timeout() -> float:
+    """Longest a caller waits for its batch: every attempt the OpenAI client may make, plus the batch window."""
+    attempt = settings.openai_connect_timeout_seconds + settings.openai_embedding_timeout_seconds
+    return attempt * (settings.openai_max_retries + 1) + settings.query_batch_wait_ms / 1000.0
+
+
+# ======================================
+# ✅ Micro-batching Dispatcher
+# ======================================
+class EmbeddingBatcher:
+    """
+    Coalesces concurrent single-query embedding requests.
+
+    Callers enqueue a text and block on a future. A collector thread takes
+    the first waiting text, gathers more for up to ``max_wait_ms`` (or until
+    ``max_batch`` texts), embeds them with one ``embedder.embed`` call and
+    resolves every caller's future. While all ``workers`` are busy, new
+    requests keep queueing, so batches grow with load instead of latency.
+    A lone query with no batch in flight is dispatched without waiting, and
+    callers give up after ``timeout`` seconds.
+    """
+
+    def __init__(self, embedder, max_wait_ms: float, max_batch: int, workers: int, timeout: float):
+        self.embedder = embedder
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch = max(1, max_batch)
+        self.workers = max(1, workers)
+        self.timeout = timeout
+        self._queue: queue.Queue = queue.Queue()
+        self._slots = threading.Semaphore(self.workers)
+        self._in_flight = 0
+        self._in_flight_lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="embed-batch")
+        self._stats_lock = threading.Lock()
+        self._stats = {
+            "requests": 0,
+            "batches": 0,
+            "embedded": 0,
+            "deduplicated": 0,
+            "max_batch_size": 0,
+            "queue_wait_seconds": 0.0,
+            "timeouts": 0,
+            "histogram": {str(b): 0 for b in BATCH_SIZE_BUCKETS} | {f">{BATCH_SIZE_BUCKETS[-1]}": 0},
+        }
+        self._collector = threading.Thread(target=self._collect_loop, name="embed-collector", daemon=True)
+        self._collector.start()
+
+    def embed(self, text: str) -> np.ndarray:
+        future: Future = Future()
+        self._queue.put((text, future, time.perf_counter()))
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            # Still queued: drop it. Already in a batch: its result is ignored.
+            future.cancel()
+            with self._stats_lock:
+                self._stats["timeouts"] += 1
+            raise EmbeddingTimeoutError(
+                f"Query embedding timed out after {self.timeout:.1f}s ({self.embedder.provider}:{self.embedder.model})."
+            )
+
+    def _next_live(self, timeout: float | None = None):
+        """Next queued request whose caller is still waiting; marks it running."""
+        while True:
+            item = self._queue.get(timeout=timeout) if timeout is None or timeout > 0 else self._queue.get_nowait()
+            if item[1].set_running_or_notify_cancel():
+                return item
+
+    def _collect_loop(self):
+        while True:
+            # Only start a batch once a worker can run it; meanwhile requests pile up
+            self._slots.acquire()
+            batch = [self._next_live()]
+            with self._in_flight_lock:
+                # Nothing queued behind it and nothing running: waiting would only add latency
+                idle = not self._in_flight and self._queue.empty()
+                self._in_flight += 1
+            deadline = batch[0][2] + (0.0 if idle else self.max_wait)
+            while len(batch) < self.max_batch:
+                try:
+                    batch.append(self._next_live(deadline - time.perf_counter()))
+                except queue.Empty:
+                    break
+            self._executor.submit(self._run_batch, batch)
+
+    def _run_batch(self, batch: List[Tuple[str, Future, float]]):
+        try:
+            started = time.perf_counter()
+            # Identical concurrent queries (popular searches) are embedded once
+            unique = list(dict.fromkeys(text for text, _, _ in batch))
+            try:
+                rows = dict(zip(unique, self.embedder.embed(unique)))
+                for text, future, _ in batch:
+                    future.set_result(rows[text])
+            except Exception as e:
+                logger.warning(f"⚠️ Embedding batch of {len(batch)} queries failed: {e}")
+                for _, future, _ in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                return
+            self._record(batch, len(unique), started)
+        finally:
+            with self._in_flight_lock:
+                self._in_flight -= 1
+            self._slots.release()
+
+    def _record(self, batch, unique_count: int, started: float):
+        size = len(batch)
+        bucket = next((str(b) for b in BATCH_SIZE_BUCKETS if size <= b), f">{BATCH_SIZE_BUCKETS[-1]}")
+        with self._stats_lock:
+            self._stats["requests"] += size
+            self._stats["batches"] += 1
+            self._stats["embedded"] += unique_count
+            self._stats["deduplicated"] += size - unique_count
+            self._stats["max_batch_size"] = max(self._stats["max_batch_size"], size)
+            self._stats["queue_wait_seconds"] += sum(started - enqueued for _, _, enqueued in batch)
+            self._stats["histogram"][bucket] += 1
+
+    def stats(self) -> Dict:
+        with self._stats_lock:
+            stats = {**self._stats, "histogram": dict(self._stats["histogram"])}
+        requests = stats.pop("requests")
+        wait = stats.pop("queue_wait_seconds")
+        return {
+            "provider": self.embedder.provider,
+            "model": self.embedder.model,
+            "max_wait_ms": round(self.max_wait * 1000.0, 2),
+            "max_batch": self.max_batch,
+            "workers": self.workers,
+            "timeout_seconds": round(self.timeout, 1),
+            "requests": requests,
+            **stats,
+            "mean_batch_size": round(requests / stats["batches"], 2) if stats["batches"] else 0.0,
+            "mean_queue_wait_ms": round(wait / requests * 1000.0, 3) if requests else 0.0,
+            "queued": self._queue.qsize(),
+            "in_flight": self._in_flight,
+        }
+
+
+_batchers: Dict[str, EmbeddingBatcher] = {}
+_batchers_lock = threading.Lock()
+
+
+def get_batcher(embedder) -> EmbeddingBatcher:
+    key = f"{embedder.provider}:{embedder.model}"
+    with _batchers_lock:
+        if key not in _batchers:
+            # One local forward pass at a time; OpenAI batches can overlap on the network
+            workers = 1 if embedder.provider == LOCAL_PROVIDER else settings.query_batch_openai_workers
+            _batchers[key] = EmbeddingBatcher(
+                embedder, settings.query_batch_wait_ms, settings.query_batch_max_size, workers, result_timeout()
+            )
+        return _batchers[key]
+
+
+def embed_query(embedder, text: str) -> np.ndarray:
+    """Embed one query, micro-batched with concurrent callers when enabled."""
+    if not settings.query_batching:
+        return embedder.embed([text])[0]
+    return get_batcher(embedder).embed(text)
+
+
+def batcher_stats() -> List[Dict]:
+    with _batchers_lock:
+        batchers = list(_batchers.values())
+    return [b.stats() for b in batchers]
@@ -0,0 +1,207 @@
+from typing import Dict, List, Optional, Tuple
+import threading
+import logging
+import numpy as np
+from openai import BadRequestError
+from app.config.settings import settings
+from app.services.openai_client import (
+    client,
+    embedding_breaker,
+    call_with_breaker,
+    embedding_timeout
+)
+
+logger = logging.getLogger(__name__)
+
+OPENAI_PROVIDER = "openai"
+LOCAL_PROVIDER = "local"
+
+
+class EmbeddingUnavailableError(RuntimeError):
+    """Raised when the embedder an index is pinned to cannot produce vectors."""
+
+
+class EmbeddingInputError(ValueError):
+    """Raised when the provider rejects the input itself (e.g. a text over the token limit)."""
+
+
+# =====================================
+# ✅ OpenAI Embedder
+# =====================================
+class OpenAIEmbedder:
+    provider = OPENAI_PROVIDER
+
+    def __init__(self, model: str, batch_size: int):
+        self.model = model
+        self.batch_size = max(1, batch_size)
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        vectors = []
+        for start in range(0, len(texts), self.batch_size):
+            batch = texts[start:start + self.batch_size]
+            try:
+                response = call_with_breaker(
+                    embedding_breaker,
+                    client.embeddings.create,
+                    model=self.model,
+                    input=batch,
+                    timeout=embedding_timeout()
+                )
+            except BadRequestError as e:
+                raise EmbeddingInputError(f"OpenAI rejected the input ({self.model}): {e}") from e
+            except Exception as e:
+                raise EmbeddingUnavailableError(f"OpenAI embedding failed ({self.model}): {e}") from e
+            ordered = sorted(response.data, key=lambda d: d.index)
+            vectors.extend(d.embedding for d in ordered)
+        return np.asarray(vectors, dtype=np.float32)
+
+
+# =====================================
+# ✅ Local Embedder (SentenceTransformer on CPU)
+# =====================================
+class LocalEmbedder:
+    provider = LOCAL_PROVIDER
+
+    def __init__(self, model: str, batch_size: int):
+        self.model = model
+        self.batch_size = max(1, batch_size)
+        self._model = None
+        self._lock = threading.Lock()
+
+    def _load(self):
+        # Loading MiniLM takes seconds; only pay for it when the local path is used.
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    from sentence_transformers import SentenceTransformer
+                    logger.info(f"🧠 Loading local embedding model: {self.model}")
+                    self._model = SentenceTransformer(self.model, device="cpu")
+        return self._model
+
+    def embed(self, texts: List[str]) -> np.ndarray:
+        try:
+            vectors = self._load().encode(
+                texts,
+                batch_size=self.batch_size,
+                convert_to_numpy=True,
+                show_progress_bar=False
+            )
+        except Exception as e:
+            raise EmbeddingUnavailableError(f"Local embedding failed ({self.model}): {e}") from e
+        return np.asarray(vectors, dtype=np.float32).reshape(len(texts), -1)
+
+
+_embedders: Dict[str, object] = {}
+_embedders_lock = threading.Lock()
+
+
+def get_embedder(provider: str, model: Optional[str] = None):
+    """Return the shared embedder for ``provider``/``model``, creating it on first use."""
+    if provider == OPENAI_PROVIDER:
+        model = model or settings.openai_embedding_model
+        factory = lambda: OpenAIEmbedder(model, settings.embedding_batch_size)  # noqa: E731
+    elif provider == LOCAL_PROVIDER:
+        model = model or settings.local_embedding_model
+        factory = lambda: LocalEmbedder(model, settings.local_embedding_batch_size)  # noqa: E731
+    else:
+        raise ValueError(f"❌ Unknown embedding provider: {provider}")
+
+    key = f"{provider}:{model}"
+    with _embedders_lock:
+        if key not in _embedders:
+            _embedders[key] = factory()
+        return _embedders[key]
+
+
+def default_provider() -> str:
+    return LOCAL_PROVIDER if settings.offline_mode else OPENAI_PROVIDER
+
+
+def embedder_for_index(info: Dict):
+    """
+    The embedder matching the provider and model an index was built with.
+
+    In offline mode an OpenAI-built index cannot be queried (its vectors
+    are only comparable with OpenAI query vectors), so this raises
+    ``EmbeddingUnavailableError`` instead of reaching the network.
+    """
+    if settings.offline_mode and info["provider"] == OPENAI_PROVIDER:
+        raise EmbeddingUnavailableError(
+            "Index was built with OpenAI embeddings and OFFLINE_MODE is set; "
+            "rebuild the index offline to search it"
+        )
+    return get_embedder(info["provider"], info["model"])
+
+
+def embed_or_skip(embedder, texts: List[str]) -> Tuple[np.ndarray, List[Tuple[int, str]]]:
+    """
+    Embed ``texts``, leaving out the ones the provider rejects.
+
+    Blank texts are skipped without a request. A batch rejected as bad
+    input is split in half until the offending texts are isolated, so one
+    bad document costs a few extra calls instead of the whole batch.
+    ``EmbeddingUnavailableError`` (auth, connection, open breaker) is not
+    caught. Returns the vectors of the kept texts, in order, and
+    ``(index, reason)`` for every skipped one.
+    """
+    rows: List[np.ndarray] = []
+    skipped: List[Tuple[int, str]] = [(i, "no text") for i, text in enumerate(texts) if not text.strip()]
+    pending = [i for i, text in enumerate(texts) if text.strip()]
+
+    def embed_indexes(indexes: List[int]):
+        try:
+            rows.append(embedder.embed([texts[i] for i in indexes]))
+        except EmbeddingInputError as e:
+            if len(indexes) == 1:
+                skipped.append((indexes[0], str(e)))
+                return
+            middle = len(indexes) // 2
+            embed_indexes(indexes[:middle])
+            embed_indexes(indexes[middle:])
+
+    for start in range(0, len(pending), embedder.batch_size):
+        embed_indexes(pending[start:start + embedder.batch_size])
+
+    vectors = np.vstack(rows) if rows else np.empty((0, 0), dtype=np.float32)
+    return vectors, sorted(skipped)
+
+
+def embed_for_build(texts: List[str]):
+    """
+    Embed a whole corpus with a single provider.
+
+    If OpenAI is unusable before any vector has been accepted (and fallback
+    is allowed) the entire build is done locally instead. A failure after
+    that point aborts the build rather than mixing vectors from two models.
+    Texts the provider rejects are skipped, not fatal.
+
+    Returns ``(vectors, embedder, skipped)`` where ``skipped`` holds
+    ``(index, reason)`` for every text left out of ``vectors``.
+    """
+    embedder = get_embedder(default_provider())
+    parts: List[np.ndarray] = []
+    skipped: List[Tuple[int, str]] = []
+    start = 0
+    while start < len(texts):
+        chunk = texts[start:start + embedder.batch_size]
+        try:
+            vectors, chunk_skipped = embed_or_skip(embedder, chunk)
+        except EmbeddingUnavailableError as e:
+            if parts or embedder.provider != OPENAI_PROVIDER or not settings.embedding_fallback_to_local:
+                raise
+            logger.warning(f"⚠️ {e} — building the whole index with the local model instead.")
+            embedder = get_embedder(LOCAL_PROVIDER)
+            skipped, start = [], 0
+            continue
+        if len(vectors):
+            parts.append(vectors)
+        skipped.extend((start + i, reason) for i, reason in chunk_skipped)
+        start += len(chunk)
+
+    if not parts:
+        raise ValueError("❌ No valid embeddings generated.")
+    return np.vstack(parts), embedder, skipped
+
+
+def index_info(embedder, dim: int) -> Dict:
+    return {"provider": embedder.provider, "model": embedder.model, "dim": int(dim)}
@@ -0,0 +1,166 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, List
+import queue
+import tempfile
+import threading
+import time
+import logging
+import pytesseract
+from PIL import Image
+from app.config.settings import settings
+
+try:
+    import tesserocr
+except ImportError:  # optional — the pytesseract engine is always available
+    tesserocr = None
+
+logger = logging.getLogger(__name__)
+
+# Tesseract's text renderer ends every page with this separator
+PAGE_SEPARATOR = "\f"
+
+
+# ======================================
+# ✅ Warm In-Process Handles (tesserocr)
+# ======================================
+class TesserocrEngine:
+    """
+    A bounded pool of initialized ``PyTessBaseAPI`` handles.
+
+    Language data is loaded once per handle, and tesserocr releases the GIL
+    while recognizing, so ``pool_size`` images are OCR'd in parallel threads.
+    """
+
+    name = "tesserocr"
+
+    def __init__(self, pool_size: int, lang: str):
+        self.pool_size = max(1, pool_size)
+        self._handles: queue.Queue = queue.Queue()
+        for _ in range(self.pool_size):
+            self._handles.put(tesserocr.PyTessBaseAPI(lang=lang))
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="ocr")
+
+    def _ocr_one(self, image: Image.Image) -> str:
+        api = self._handles.get()
+        try:
+            api.SetImage(image)
+            return api.GetUTF8Text()
+        finally:
+            api.Clear()
+            self._handles.put(api)
+
+    def ocr(self, images: List[Image.Image]) -> List[str]:
+        if len(images) == 1:
+            return [self._ocr_one(images[0])]
+        return list(self._executor.map(self._ocr_one, images))
+
+
+# ======================================
+# ✅ Batched Subprocess Engine (pytesseract)
+# ======================================
+class PytesseractEngine:
+    """
+    Falls back to the ``tesseract`` binary, but amortizes process start-up
+    and language loading: a batch of images is written to a temp dir and
+    handed to one tesseract invocation as a file list. Up to ``pool_size``
+    invocations run concurrently.
+    """
+
+    name = "pytesseract"
+
+    def __init__(self, pool_size: int, batch_size: int, lang: str):
+        self.pool_size = max(1, pool_size)
+        self.batch_size = max(1, batch_size)
+        self.lang = lang
+        self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix="ocr")
+
+    def _ocr_batch(self, images: List[Image.Image]) -> List[str]:
+        if len(images) == 1:
+            return [pytesseract.image_to_string(images[0], lang=self.lang)]
+
+        with tempfile.TemporaryDirectory(prefix="ocr_batch_") as tmp:
+            tmp_dir = Path(tmp)
+            paths = []
+            for i, image in enumerate(images):
+                path = tmp_dir / f"page_{i:05d}.png"
+                image.save(str(path), compress_level=1)
+                paths.append(str(path))
+            list_file = tmp_dir / "pages.txt"
+            list_file.write_text("\n".join(paths) + "\n", encoding="utf-8")
+
+            output = pytesseract.image_to_string(str(list_file), lang=self.lang)
+
+        pages = output.split(PAGE_SEPARATOR)
+        # Output ends with a separator, leaving an empty trailing chunk
+        if len(pages) == len(images) + 1 and not pages[-1].strip():
+            pages = pages[:-1]
+        if len(pages) != len(images):
+            logger.warning(f"⚠️ Batch OCR returned {len(pages)} pages for {len(images)} images; retrying one by one.")
+            return [pytesseract.image_to_string(image, lang=self.lang) for image in images]
+        return pages
+
+    def ocr(self, images: List[Image.Image]) -> List[str]:
+        batches = [images[i:i + self.batch_size] for i in range(0, len(images), self.batch_size)]
+        if len(batches) == 1:
+            return self._ocr_batch(batches[0])
+        return [text for batch in self._executor.map(self._ocr_batch, batches) for text in batch]
+
+
+# ======================================
+# ✅ Engine Selection + Stats
+# ======================================
+_engine = None
+_engine_lock = threading.Lock()
+_stats = {"calls": 0, "images": 0, "seconds": 0.0}
+_stats_lock = threading.Lock()
+
+
+def _create_engine():
+    choice = settings.ocr_engine.lower()
+    if choice in ("auto", "tesserocr") and tesserocr is not None:
+        try:
+            return TesserocrEngine(settings.ocr_pool_size, settings.ocr_lang)
+        except Exception as e:
+            logger.warning(f"⚠️ tesserocr init failed ({e}); using pytesseract.")
+    elif choice == "tesserocr":
+        logger.warning("⚠️ OCR_ENGINE=tesserocr but tesserocr is not installed; using pytesseract.")
+    return PytesseractEngine(settings.ocr_pool_size, settings.ocr_batch_size, settings.ocr_lang)
+
+
+def get_ocr_engine():
+    global _engine
+    if _engine is None:
+        with _engine_lock:
+            if _engine is None:
+                _engine = _create_engine()
+                logger.info(f"🔠 OCR engine: {_engine.name} (pool size {_engine.pool_size})")
+    return _engine
+
+
+def ocr_images(images: List[Image.Image]) -> List[str]:
+    """OCR several preprocessed images; results are in input order."""
+    if not images:
+        return []
+    start = time.perf_counter()
+    texts = get_ocr_engine().ocr(images)
+    with _stats_lock:
+        _stats["calls"] += 1
+        _stats["images"] += len(images)
+        _stats["seconds"] += time.perf_counter() - start
+    return [text.strip() for text in texts]
+
+
+def ocr_engine_stats() -> Dict:
+    """Throughput so far; reports the configured engine without starting it if no OCR has run yet."""
+    engine = _engine
+    with _stats_lock:
+        stats = dict(_stats)
+    stats["images_per_sec"] = round(stats["images"] / stats["seconds"], 3) if stats["seconds"] else 0.0
+    stats["seconds"] = round(stats["seconds"], 3)
+    return {
+        "engine": engine.name if engine else settings.ocr_engine,
+        "started": engine is not None,
+        "pool_size": engine.pool_size if engine else settings.ocr_pool_size,
+        **stats,
+    }
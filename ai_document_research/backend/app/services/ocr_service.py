@@ -1,13 +1,14 @@
 from pathlib import Path
-from PIL import Image, UnidentifiedImageError
+from PIL import Image, ImageOps, UnidentifiedImageError
 import pytesseract
+from app.config.settings import settings
+from app.services.ocr_engine import ocr_images
 import os
 import platform
 import logging
 
 # Logger setup
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
 
 # Setup Tesseract path for Windows
 if platform.system().lower() == "windows":
@@ -18,12 +19,152 @@ if platform.system().lower() == "windows":
         logger.warning(f"⚠️ Tesseract not found at {tesseract_path}. OCR will fail if not installed.")
     pytesseract.pytesseract.tesseract_cmd = str(tesseract_path)
 
+# ======================================
+# ✅ OCR Preprocessing
+# ======================================
+# Camera and screen defaults that say nothing about the real resolution
+PLACEHOLDER_DPI = (72, 96)
+
+
+def _target_scale(size: tuple[int, int], dpi) -> float:
+    """Scale factor that brings the image to ``ocr_target_dpi``."""
+    longest = max(size)
+    dpi = float(dpi[0]) if dpi and dpi[0] else 0.0
+    # A DPI is trusted only if it is not a placeholder and implies a page-sized image
+    if dpi > 1 and round(dpi) not in PLACEHOLDER_DPI and longest / dpi <= settings.ocr_max_page_inches:
+        # Known resolution: scale to the target, allowing a modest upscale of low-DPI scans
+        scale = min(settings.ocr_target_dpi / dpi, settings.ocr_max_upscale)
+    else:
+        # Unknown resolution (camera photos): assume the longest side spans a page; never upscale
+        scale = min(settings.ocr_target_dpi * settings.ocr_assumed_page_inches / longest, 1.0)
+    # Never grow an image past the pixel budget of the largest plausible page
+    budget = settings.ocr_target_dpi * settings.ocr_max_page_inches
+    return min(scale, max(budget / longest, 1.0)) if scale > 1 else scale
+
+
+def _otsu_threshold(gray: Image.Image) -> int:
+    histogram = gray.histogram()[:256]
+    total = sum(histogram)
+    sum_all = sum(i * h for i, h in enumerate(histogram))
+    sum_bg = weight_bg = 0
+    best_threshold, best_variance = 127, -1.0
+    for t, count in enumerate(histogram):
+        weight_bg += count
+        if weight_bg == 0:
+            continue
+        weight_fg = total - weight_bg
+        if weight_fg == 0:
+            break
+        sum_bg += t * count
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (sum_all - sum_bg) / weight_fg
+        variance = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+        if variance > best_variance:
+            best_threshold, best_variance = t, variance
+    return best_threshold
+
+
+def _correct_orientation(image: Image.Image) -> Image.Image:
+    try:
+        osd = pytesseract.image_to_osd(image, output_type=pytesseract.Output.DICT)
+    except Exception as e:
+        # OSD needs a fair amount of text; short snippets are OCR'd as-is
+        logger.debug(f"🧭 Orientation detection skipped: {e}")
+        return image
+    rotate = int(osd.get("rotate", 0))
+    return image.rotate(-rotate, expand=True, fillcolor=255) if rotate else image
+
+
+def _normalize(image: Image.Image, target: tuple[int, int], upscale: bool) -> Image.Image:
+    if image.mode != "L":
+        image = image.convert("L")
+
+    # EXIF rotation may have swapped width and height
+    if (image.size[0] > image.size[1]) != (target[0] > target[1]):
+        target = (target[1], target[0])
+    if image.size != target:
+        image = image.resize(target, Image.Resampling.BICUBIC if upscale else Image.Resampling.LANCZOS)
+
+    if settings.ocr_binarize:
+        threshold = _otsu_threshold(image)
+        image = image.point([0 if v <= threshold else 255 for v in range(256)])
+
+    if settings.ocr_detect_orientation:
+        image = _correct_orientation(image)
+
+    return image
+
+
+def _scaled_size(size: tuple[int, int], scale: float) -> tuple[int, int]:
+    return max(1, round(size[0] * scale)), max(1, round(size[1] * scale))
+
+
+def preprocess_image(image: Image.Image, dpi=None) -> Image.Image:
+    """Normalize an in-memory image (e.g. a rendered PDF page) for Tesseract."""
+    if not settings.ocr_preprocess:
+        return image
+    scale = _target_scale(image.size, dpi or image.info.get("dpi"))
+    return _normalize(image, _scaled_size(image.size, scale), upscale=scale > 1)
+
+
+def load_image_for_ocr(image_path: Path) -> Image.Image:
+    """
+    Open an image and normalize it for Tesseract: target DPI, grayscale,
+    optional binarization and orientation fix.
+
+    JPEGs are decoded in draft mode: straight to grayscale, and when the
+    target is at most half the size, reduced by a power of two inside the
+    decoder rather than after every pixel is materialized.
+    """
+    with Image.open(image_path) as image:
+        if not settings.ocr_preprocess:
+            image.load()
+            return image.copy()
+
+        scale = _target_scale(image.size, image.info.get("dpi"))
+        target = _scaled_size(image.size, scale)
+        if image.format == "JPEG" and scale < 1:
+            image.draft("L", target)
+
+        image = ImageOps.exif_transpose(image)
+        return _normalize(image, target, upscale=scale > 1)
+
+
+def ocr_image(image_path: Path) -> str:
+    """Preprocess and OCR one image file; shared by upload extraction and conversion."""
+    image = load_image_for_ocr(image_path)
+    try:
+        return ocr_images([image])[0]
+    finally:
+        image.close()
+
+
+def ocr_pdf_pages(pdf_path: Path) -> str:
+    """
+    OCR a scanned (image-only) PDF. Pages are rendered straight to grayscale
+    at the target DPI and sent to the OCR engine a batch at a time.
+    """
+    import fitz
+
+    texts = []
+    batch_size = max(1, settings.ocr_batch_size * settings.ocr_pool_size)
+    with fitz.open(str(pdf_path)) as doc:
+        page_count = min(len(doc), settings.ocr_pdf_max_pages)
+        for start in range(0, page_count, batch_size):
+            images = []
+            for page_number in range(start, min(start + batch_size, page_count)):
+                pix = doc[page_number].get_pixmap(dpi=settings.ocr_target_dpi, colorspace=fitz.csGRAY)
+                page = Image.frombytes("L", (pix.width, pix.height), pix.samples)
+                images.append(preprocess_image(page, dpi=(settings.ocr_target_dpi, settings.ocr_target_dpi)))
+            texts.extend(ocr_images(images))
+    return "\n".join(t for t in texts if t)
+
+
 def extract_text_from_image(image_path: Path) -> str:
     """Extract text from image using Tesseract OCR."""
     try:
         logger.info(f"🖼️ OCR started on image: {image_path.name}")
-        with Image.open(image_path) as image:
-            text = pytesseract.image_to_string(image).strip()
+        text = ocr_image(image_path)
 
         if not text:
             logger.warning(f"⚠️ No text found in image: {image_path.name}")
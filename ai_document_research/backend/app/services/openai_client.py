@@ -0,0 +1,182 @@
+from pathlib import Path
+from typing import Dict, Optional
+import os
+import threading
+import time
+import logging
+import httpx
+from dotenv import load_dotenv
+from openai import OpenAI, BadRequestError
+from app.config.settings import settings
+
+# Load .env
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+ENV_PATH = BASE_DIR / ".env"
+load_dotenv(dotenv_path=ENV_PATH)
+
+logger = logging.getLogger(__name__)
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised when a call is refused because its circuit breaker is open."""
+
+
+# ======================================
+# ✅ Circuit Breaker
+# ======================================
+class CircuitBreaker:
+    """
+    Classic closed → open → half-open breaker.
+
+    After ``failure_threshold`` consecutive failures the breaker opens and
+    every call is refused for ``cooldown_seconds``. The first call after the
+    cool-down is let through as a probe; success closes the breaker, failure
+    re-opens it for another cool-down.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int, cooldown_seconds: float):
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown_seconds = cooldown_seconds
+        self._lock = threading.Lock()
+        self._state = self.CLOSED
+        self._consecutive_failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._stats = {"calls": 0, "failures": 0, "short_circuited": 0, "times_opened": 0}
+        self._last_error: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown_seconds:
+            self._state = self.HALF_OPEN
+            self._probe_in_flight = False
+        return self._state
+
+    def allow_request(self) -> bool:
+        with self._lock:
+            state = self._current_state()
+            if state == self.CLOSED:
+                self._stats["calls"] += 1
+                return True
+            if state == self.HALF_OPEN and not self._probe_in_flight:
+                self._probe_in_flight = True
+                self._stats["calls"] += 1
+                return True
+            self._stats["short_circuited"] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info(f"✅ Circuit '{self.name}' closed — OpenAI reachable again.")
+            self._state = self.CLOSED
+            self._consecutive_failures = 0
+            self._probe_in_flight = False
+
+    def record_failure(self, error: Exception) -> None:
+        with self._lock:
+            self._stats["failures"] += 1
+            self._consecutive_failures += 1
+            self._last_error = f"{type(error).__name__}: {error}"
+            self._probe_in_flight = False
+            if self._state == self.HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    self._stats["times_opened"] += 1
+                    logger.warning(
+                        f"⚠️ Circuit '{self.name}' opened after {self._consecutive_failures} failure(s); "
+                        f"using local fallback for {self.cooldown_seconds:.0f}s."
+                    )
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def snapshot(self) -> Dict:
+        with self._lock:
+            state = self._current_state()
+            retry_in = 0.0
+            if state == self.OPEN:
+                retry_in = max(0.0, self.cooldown_seconds - (time.monotonic() - self._opened_at))
+            return {
+                "name": self.name,
+                "state": state,
+                "consecutive_failures": self._consecutive_failures,
+                "failure_threshold": self.failure_threshold,
+                "cooldown_seconds": self.cooldown_seconds,
+                "retry_in_seconds": round(retry_in, 2),
+                "last_error": self._last_error,
+                **self._stats,
+            }
+
+
+# ======================================
+# ✅ Shared OpenAI Client
+# ======================================
+def build_openai_client() -> OpenAI:
+    """One pooled client with bounded retries, shared by every OpenAI call in the app."""
+    http_client = httpx.Client(
+        limits=httpx.Limits(
+            max_connections=settings.openai_max_connections,
+            max_keepalive_connections=settings.openai_max_keepalive_connections,
+        ),
+        timeout=httpx.Timeout(settings.openai_chat_timeout_seconds, connect=settings.openai_connect_timeout_seconds),
+    )
+    return OpenAI(
+        api_key=os.getenv("OPENAI_API_KEY") or settings.openai_api_key,
+        max_retries=settings.openai_max_retries,
+        http_client=http_client,
+    )
+
+
+client = build_openai_client()
+
+embedding_breaker = CircuitBreaker(
+    "openai-embeddings", settings.breaker_failure_threshold, settings.breaker_cooldown_seconds
+)
+chat_breaker = CircuitBreaker(
+    "openai-chat", settings.breaker_failure_threshold, settings.breaker_cooldown_seconds
+)
+
+
+def embedding_timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.openai_embedding_timeout_seconds, connect=settings.openai_connect_timeout_seconds)
+
+
+def chat_timeout() -> httpx.Timeout:
+    return httpx.Timeout(settings.openai_chat_timeout_seconds, connect=settings.openai_connect_timeout_seconds)
+
+
+def call_with_breaker(breaker: CircuitBreaker, fn, *args, **kwargs):
+    """
+    Run an OpenAI call through ``breaker``.
+
+    Raises ``CircuitOpenError`` without touching the network while the
+    breaker is open. Bad requests (our fault, not an outage) propagate
+    without counting against the breaker.
+    """
+    if not breaker.allow_request():
+        raise CircuitOpenError(f"Circuit '{breaker.name}' is open.")
+    try:
+        result = fn(*args, **kwargs)
+    except BadRequestError:
+        breaker.record_success()
+        raise
+    except Exception as e:
+        breaker.record_failure(e)
+        raise
+    breaker.record_success()
+    return result
+
+
+def breaker_status() -> Dict:
+    return {
+        "embeddings": embedding_breaker.snapshot(),
+        "chat": chat_breaker.snapshot(),
+    }
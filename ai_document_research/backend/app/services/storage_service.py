@@ -0,0 +1,235 @@
+from pathlib import Path
+from typing import Dict, List, Tuple
+import hashlib
+import os
+import threading
+import time
+import logging
+from app.config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Storage areas managed by the sweeper
+UPLOADS = "uploads"
+PROCESSED = "processed"
+CONVERTED = "converted"
+
+_lock = threading.Lock()
+# Bytes written since the last sweep; crossing the quota wakes the sweeper early
+_bytes_since_sweep = 0
+_last_sweep: Dict = {}
+_sweeper: threading.Thread | None = None
+_wake = threading.Event()
+_stop = threading.Event()
+
+
+def area_dirs() -> Dict[str, Path]:
+    return {
+        UPLOADS: settings.upload_dir,
+        PROCESSED: settings.processed_dir,
+        CONVERTED: settings.convert_dir,
+    }
+
+
+# ======================================
+# ✅ Hashed Paths
+# ======================================
+def storage_path(area: str, filename: str) -> Path:
+    """
+    Path for a new file in ``area``, spread over hashed subdirectories
+    (``ab/cd/<filename>``) so no single directory grows unbounded.
+    """
+    digest = hashlib.sha1(filename.encode("utf-8")).hexdigest()
+    directory = area_dirs()[area]
+    for level in range(settings.storage_fanout_levels):
+        directory = directory / digest[level * 2:level * 2 + 2]
+    directory.mkdir(parents=True, exist_ok=True)
+    return directory / filename
+
+
+def save_bytes(area: str, filename: str, data: bytes) -> Path:
+    path = storage_path(area, filename)
+    path.write_bytes(data)
+    track(path)
+    return path
+
+
+def track(path: Path) -> None:
+    """Account for a file written outside ``save_bytes`` (e.g. conversion output)."""
+    global _bytes_since_sweep
+    try:
+        size = path.stat().st_size
+    except OSError:
+        return
+    with _lock:
+        _bytes_since_sweep += size
+        used = _last_sweep.get("bytes_after", 0) + _bytes_since_sweep
+    if used > settings.storage_max_bytes:
+        _wake.set()
+
+
+def release(*paths: Path, tracked: bool = True) -> None:
+    """
+    Delete files that are no longer needed (missing files are ignored).
+    Pass ``tracked=False`` for files that never went through ``track``, so
+    their size is not taken off the usage counter.
+    """
+    global _bytes_since_sweep
+    for path in paths:
+        try:
+            size = path.stat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            logger.warning(f"⚠️ Cleanup failed for {path.name}: {e}")
+            continue
+        # Files released by a request were almost always written since the last
+        # sweep; older ones are recounted by the next sweep, hence the clamp
+        if tracked:
+            with _lock:
+                _bytes_since_sweep = max(0, _bytes_since_sweep - size)
+        logger.debug(f"🧹 Deleted file: {path.name}")
+
+
+# ======================================
+# ✅ TTL + Quota Sweep
+# ======================================
+def _scan(directory: Path) -> List[Tuple[float, int, str]]:
+    """(last use, size, path) for every file below ``directory``."""
+    files = []
+    stack = [str(directory)]
+    while stack:
+        try:
+            entries = os.scandir(stack.pop())
+        except OSError:
+            continue
+        with entries:
+            for entry in entries:
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        st = entry.stat(follow_symlinks=False)
+                        files.append((max(st.st_atime, st.st_mtime), st.st_size, entry.path))
+                except OSError:
+                    continue
+    return files
+
+
+def _remove(path: str) -> bool:
+    try:
+        os.unlink(path)
+        return True
+    except FileNotFoundError:
+        return False
+    except OSError as e:
+        logger.warning(f"⚠️ Could not evict {path}: {e}")
+        return False
+
+
+def sweep() -> Dict:
+    """
+    Delete files past ``storage_ttl_hours``, then evict least-recently-used
+    files until usage is below ``storage_low_watermark`` of the byte quota.
+    Files younger than ``storage_min_age_seconds`` are never touched, since
+    a request may still be working on them.
+    """
+    global _bytes_since_sweep
+    start = time.perf_counter()
+    now = time.time()
+    ttl_cutoff = now - settings.storage_ttl_hours * 3600
+    min_age_cutoff = now - settings.storage_min_age_seconds
+
+    with _lock:
+        _bytes_since_sweep = 0
+
+    expired = evicted = freed = 0
+    kept: List[Tuple[float, int, str, str]] = []
+    usage = {area: {"files": 0, "bytes": 0} for area in area_dirs()}
+    for area, directory in area_dirs().items():
+        for last_used, size, path in _scan(directory):
+            if last_used < ttl_cutoff and _remove(path):
+                expired += 1
+                freed += size
+                continue
+            kept.append((last_used, size, path, area))
+            usage[area]["files"] += 1
+            usage[area]["bytes"] += size
+
+    total = sum(item[1] for item in kept)
+    if total > settings.storage_max_bytes:
+        target = settings.storage_max_bytes * settings.storage_low_watermark
+        for last_used, size, path, area in sorted(kept):
+            if total <= target or last_used >= min_age_cutoff:
+                break  # sorted oldest first: everything after this is newer still
+            if _remove(path):
+                evicted += 1
+                freed += size
+                total -= size
+                usage[area]["files"] -= 1
+                usage[area]["bytes"] -= size
+        if total > settings.storage_max_bytes:
+            logger.warning(f"⚠️ Storage still over quota ({total} bytes): remaining files are in use.")
+
+    result = {
+        "finished_at": now,
+        "duration_ms": round((time.perf_counter() - start) * 1000.0, 2),
+        "expired": expired,
+        "evicted": evicted,
+        "freed_bytes": freed,
+        "bytes_after": total,
+        "areas": usage,
+    }
+    with _lock:
+        _last_sweep.clear()
+        _last_sweep.update(result)
+
+    if expired or evicted:
+        logger.info(f"🧹 Storage sweep: {expired} expired, {evicted} evicted, {freed / 1e6:.1f} MB freed.")
+    return result
+
+
+def storage_stats() -> Dict:
+    with _lock:
+        last = dict(_last_sweep)
+        pending = _bytes_since_sweep
+    return {
+        "quota_bytes": settings.storage_max_bytes,
+        "used_bytes": last.get("bytes_after", 0) + pending,
+        "written_since_sweep_bytes": pending,
+        "ttl_hours": settings.storage_ttl_hours,
+        "last_sweep": last or None,
+    }
+
+
+# ======================================
+# ✅ Background Sweeper
+# ======================================
+def _sweep_loop():
+    while not _stop.is_set():
+        try:
+            sweep()
+        except Exception as e:
+            logger.error(f"❌ Storage sweep failed: {e}")
+        _wake.wait(settings.storage_sweep_interval_seconds)
+        _wake.clear()
+
+
+def start_sweeper():
+    """Start the periodic sweeper thread (no-op if it is already running)."""
+    global _sweeper
+    if _sweeper is not None and _sweeper.is_alive():
+        return
+    _stop.clear()
+    _sweeper = threading.Thread(target=_sweep_loop, name="storage-sweeper", daemon=True)
+    _sweeper.start()
+
+
+def stop_sweeper():
+    global _sweeper
+    _stop.set()
+    _wake.set()
+    if _sweeper is not None:
+        _sweeper.join(timeout=5)
+        _sweeper = None
@@ -1,64 +1,109 @@
 # backend/app/services/vector_service.py
 
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Iterable, Optional
 import numpy as np
 import json
 import os
+import glob
+import time
 import logging
 import faiss
-from dotenv import load_dotenv
-from sentence_transformers import SentenceTransformer
-from openai import OpenAI
+from concurrent.futures import ThreadPoolExecutor
 from app.config.settings import settings
-
-# Load .env
-BASE_DIR = Path(__file__).resolve().parent.parent.parent
-ENV_PATH = BASE_DIR / ".env"
-load_dotenv(dotenv_path=ENV_PATH)
-
-# Setup OpenAI client
-client = OpenAI(api_key=os.getenv("OPENAI_API_KEY") or settings.openai_api_key)
+from app.services.openai_client import (
+    client,
+    chat_breaker,
+    call_with_breaker,
+    chat_timeout,
+    CircuitOpenError
+)
+from app.services.embedding_service import (
+    OPENAI_PROVIDER,
+    LOCAL_PROVIDER,
+    get_embedder,
+    default_provider,
+    embedder_for_index,
+    embed_for_build,
+    index_info,
+    EmbeddingUnavailableError
+)
+from app.services.embedding_batcher import embed_query
+from app.services import vector_storage
+from app.services.dedup_service import (
+    minhash_signatures,
+    find_near_duplicates,
+    similarity,
+    write_signatures,
+    open_signatures
+)
+from app.services.context_packer import pack_context, count_tokens
 
 # Logger
 logger = logging.getLogger(__name__)
-logging.basicConfig(level=logging.INFO)
 
 # Constants
-EMBEDDING_MODEL = "text-embedding-ada-002"
 CHAT_MODEL = "gpt-3.5-turbo"
 INDEX_PATH = Path(os.getenv("VECTOR_INDEX_PATH", settings.vector_index_path))
 METADATA_PATH = Path(os.getenv("VECTOR_METADATA_PATH", settings.vector_metadata_path))
+INDEX_INFO_PATH = Path(os.getenv("VECTOR_INDEX_INFO_PATH", settings.vector_index_info_path))
+EXACT_STORE_PATH = Path(os.getenv("VECTOR_EXACT_STORE_PATH", settings.vector_exact_store_path))
+MINHASH_PATH = Path(os.getenv("VECTOR_MINHASH_PATH", settings.vector_minhash_path))
+DUPLICATES_PATH = Path(os.getenv("VECTOR_DUPLICATES_PATH", settings.vector_duplicates_path))
 DOC_STORE_PATH = settings.doc_store_path
 INDEX_PATH.parent.mkdir(parents=True, exist_ok=True)
 
-# SentenceTransformer (offline fallback model)
-offline_model = SentenceTransformer("all-MiniLM-L6-v2")
+# Written once per build under a generation-stamped name; the index info
+# file (replaced last) names the current generation
+GENERATION_PATHS = (INDEX_PATH, METADATA_PATH, EXACT_STORE_PATH, MINHASH_PATH, DUPLICATES_PATH, DOC_STORE_PATH)
+
+# Indexes written before the info file existed were built with ada-002 (1536-dim) or MiniLM
+LEGACY_OPENAI_DIM = 1536
 
 # =====================================
-# ✅ Embed Text (OpenAI + Offline Fallback)
+# ✅ Embed Text (pinned to one provider)
 # =====================================
-def embed_text(text: str) -> List[float]:
-    try:
-        logger.debug("🔍 Generating embedding via OpenAI...")
-        response = client.embeddings.create(
-            model=EMBEDDING_MODEL,
-            input=[text]
-        )
-        return response.data[0].embedding
-    except Exception as e:
-        logger.warning(f"⚠️ OpenAI failed: {e} — falling back to SentenceTransformer.")
-        try:
-            return offline_model.encode(text).tolist()
-        except Exception as fallback_error:
-            logger.error(f"❌ Fallback embedding failed: {fallback_error}")
-            raise
+def embed_text(text: str, info: Optional[Dict] = None) -> List[float]:
+    """Embed with the index's own embedder when ``info`` is given, else the configured default."""
+    embedder = embedder_for_index(info) if info else get_embedder(default_provider())
+    return embed_query(embedder, text).tolist()
+
+# =====================================
+# ✅ Index Info (embedding provider, model, dim)
+# =====================================
+def read_index_info() -> Optional[Dict]:
+    if not INDEX_INFO_PATH.exists():
+        return None
+    with INDEX_INFO_PATH.open("r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def load_index_info(index, info: Optional[Dict]) -> Dict:
+    if info is None:
+        provider = OPENAI_PROVIDER if index.d == LEGACY_OPENAI_DIM else LOCAL_PROVIDER
+        info = {"provider": provider, "model": None, "dim": index.d}
+        logger.warning(f"⚠️ No index info file; assuming '{provider}' embeddings from dim={index.d}.")
+
+    if info["dim"] != index.d:
+        raise ValueError(f"❌ Index dim {index.d} does not match recorded embedding dim {info['dim']}.")
+    return info
 
 # ======================================
 # ✅ AI Answer (OpenAI + Local Fallback)
 # ======================================
 def generate_ai_answer(query: str, context_docs: List[str]) -> str:
-    context = "\n".join(context_docs)
+    if settings.offline_mode:
+        return generate_local_summary(query, context_docs)
+
+    passages = pack_context(
+        query,
+        context_docs,
+        token_budget=settings.context_token_budget,
+        passage_tokens=settings.context_passage_tokens,
+        max_tokens_per_doc=settings.context_max_tokens_per_doc,
+        dedup_threshold=settings.context_dedup_threshold
+    )
+    context = "\n\n".join(passages)
     prompt = f"""You are a helpful assistant. Use only the below context to answer the query:
 
 Context:
@@ -69,15 +114,26 @@ Query:
 
 Respond with a clear, concise answer."""
 
+    # Tokenizing the whole prompt is only worth it when the line is emitted
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("🧾 Prompt packed: %d passages, ~%d tokens.", len(passages), count_tokens(prompt))
+
     try:
-        response = client.chat.completions.create(
+        response = call_with_breaker(
+            chat_breaker,
+            client.chat.completions.create,
             model=CHAT_MODEL,
             messages=[{"role": "user", "content": prompt}],
             temperature=0.5,
-            max_tokens=500
+            max_tokens=settings.answer_max_tokens,
+            timeout=chat_timeout()
         )
         return response.choices[0].message.content.strip()  # type: ignore
 
+    except CircuitOpenError:
+        logger.debug("⏭️ Chat circuit open — using local summary.")
+        return generate_local_summary(query, context_docs)
+
     except Exception as e:
         logger.error(f"❌ Failed to generate AI answer: {e}")
         return generate_local_summary(query, context_docs)
@@ -95,72 +151,271 @@ def generate_local_summary(query: str, context_docs: List[str]) -> str:
 # ======================================
 # ✅ Build FAISS Index
 # ======================================
-def build_faiss_index_from_texts(texts: List[str], metadata: List[str]) -> None:
+def build_faiss_index_from_texts(texts: List[str], metadata: List[str]) -> Dict:
+    """
+    Embed and index ``texts``. Returns the near-duplicate statistics of the
+    build and the documents the embedder rejected (left out of the index).
+    """
     if len(texts) != len(metadata):
         raise ValueError("❌ Text and metadata counts do not match.")
 
+    if not texts:
+        raise ValueError("❌ No texts to index.")
+
     logger.info("🧠 Building FAISS index...")
-    embeddings = []
-    valid_metadata = []
 
-    try:
-        dim = len(embed_text("dimension test"))
-        index = faiss.IndexFlatL2(dim)
-    except Exception as e:
-        logger.error(f"❌ FAISS init error: {e}")
-        raise
+    # Near-duplicates are not embedded; they are linked to their canonical row instead
+    signatures, dedup_stats = None, {}
+    canonical_of = list(range(len(texts)))
+    if settings.dedup_enabled:
+        signatures = minhash_signatures(texts, settings.dedup_num_perm, settings.dedup_shingle_words)
+        canonical_of, dedup_stats = find_near_duplicates(signatures, settings.dedup_threshold)
+        logger.info(
+            f"🧬 Near-duplicates: {dedup_stats['duplicates']} of {len(texts)} documents linked to a "
+            f"canonical entry (threshold={settings.dedup_threshold})."
+        )
+    keep = [i for i, canonical in enumerate(canonical_of) if i == canonical]
+
+    # Every vector comes from the same embedder; a mid-build outage aborts
+    # the build and leaves the previous index untouched.
+    np_embeddings, embedder, rejected = embed_for_build([texts[i] for i in keep])
+    skipped = {keep[position]: reason for position, reason in rejected}
+    keep = [i for i in keep if i not in skipped]
+
+    row_of = {i: row for row, i in enumerate(keep)}
+    duplicates: Dict[str, List[str]] = {}
+    for i, canonical in enumerate(canonical_of):
+        if i == canonical:
+            continue
+        if canonical in skipped:
+            skipped[i] = f"near-duplicate of skipped document {metadata[canonical]}"
+        else:
+            duplicates.setdefault(str(row_of[canonical]), []).append(metadata[i])
+
+    write_index_from_vectors(
+        np_embeddings,
+        index_info(embedder, np_embeddings.shape[1]),
+        [metadata[i] for i in keep],
+        [texts[i] for i in keep],
+        signatures=signatures[keep] if signatures is not None else None,
+        duplicates=duplicates,
+        dedup_stats=dedup_stats
+    )
+    for i in sorted(skipped):
+        logger.warning(f"⚠️ Skipped doc {metadata[i]} due to error: {skipped[i]}")
+    return {
+        "dedup": dedup_stats,
+        "skipped": [{"metadata": metadata[i], "reason": skipped[i]} for i in sorted(skipped)],
+    }
+
+
+def write_index_from_vectors(vectors: np.ndarray, info: Dict, metadata: List[str], docs: Iterable[str],
+                             signatures: Optional[np.ndarray] = None,
+                             duplicates: Optional[Dict[str, List[str]]] = None,
+                             dedup_stats: Optional[Dict] = None) -> None:
+    """
+    Write the FAISS index, index info, metadata and doc store for ``vectors``.
+
+    ``vectors`` may be a memory-mapped array and ``docs`` any iterable, so a
+    corpus larger than RAM can be written without loading it all at once.
+    With dedup enabled, MinHash signatures are stored for search-time
+    collapsing (computed from ``docs`` while streaming if not passed in).
+
+    Artifacts go to new generation-stamped files and become visible in one
+    step when the index info file is replaced, so searches running during a
+    rebuild (in this or another process) see either the old set or the new.
+    """
+    generation = str(time.time_ns())
+    index_path, metadata_path, exact_store_path, minhash_path, duplicates_path, doc_store_path = (
+        generation_path(path, generation) for path in GENERATION_PATHS
+    )
+
+    dim = vectors.shape[1]
+    index, storage = vector_storage.create_index(
+        vectors,
+        storage=settings.vector_storage,
+        pq_m=settings.pq_subquantizers,
+        pq_bits=settings.pq_bits
+    )
+    exact_rerank = settings.rerank_exact and storage["type"] != vector_storage.FLAT
+    if exact_rerank:
+        vector_storage.write_exact_store(vectors, exact_store_path)
+
+    faiss.write_index(index, str(index_path))
+
+    with metadata_path.open("w", encoding="utf-8") as f:
+        json.dump(metadata, f, indent=2)
+
+    compute_signatures = settings.dedup_enabled and signatures is None
+    if compute_signatures:
+        # Written row by row so the bulk indexer's memory stays flat
+        signatures = np.lib.format.open_memmap(
+            str(minhash_path), mode="w+", dtype=np.uint32, shape=(len(metadata), settings.dedup_num_perm)
+        )
 
-    for i, text in enumerate(texts):
-        try:
-            emb = embed_text(text)
-            embeddings.append(emb)
-            valid_metadata.append(metadata[i])
-        except Exception as e:
-            logger.warning(f"⚠️ Skipped doc {i} due to error: {e}")
+    with doc_store_path.open("w", encoding="utf-8") as f:
+        for row, doc in enumerate(docs):
+            f.write(doc.replace("\n", " ") + "\n")
+            if compute_signatures:
+                signatures[row] = minhash_signatures([doc], settings.dedup_num_perm, settings.dedup_shingle_words)[0]
+
+    if compute_signatures:
+        signatures.flush()
+        del signatures
+    elif signatures is not None:
+        write_signatures(signatures, minhash_path)
+
+    with duplicates_path.open("w", encoding="utf-8") as f:
+        json.dump(duplicates or {}, f)
+
+    # Publish: swap the index info file in, then retire older generations
+    previous = (read_index_info() or {}).get("generation")
+    tmp_info_path = INDEX_INFO_PATH.with_name(f"{INDEX_INFO_PATH.name}.{generation}.tmp")
+    with tmp_info_path.open("w", encoding="utf-8") as f:
+        json.dump({
+            **info,
+            "storage": storage,
+            "exact_rerank": exact_rerank,
+            "dedup": dedup_stats or {},
+            "generation": generation
+        }, f, indent=2)
+    os.replace(tmp_info_path, INDEX_INFO_PATH)
+    logger.info(
+        f"✅ FAISS index saved to: {index_path} ({info['provider']}:{info['model']}, dim={dim}, "
+        f"storage={storage['type']}, {storage['bytes_per_vector']:.0f} B/vector)"
+    )
+
+    retire_generations(older_than=min(int(g) for g in (generation, previous) if g))
+
+
+def generation_path(path: Path, generation: Optional[str]) -> Path:
+    """Where ``path``'s artifact of ``generation`` lives; indexes from before generations use ``path``."""
+    if not generation:
+        return path
+    return path.with_name(f"{path.stem}.{generation}{path.suffix}")
+
+
+def retire_generations(older_than: int) -> None:
+    """
+    Delete artifacts of generations older than ``older_than`` and any
+    pre-generation files. The generation just replaced is kept so searches
+    that already read the old index info can still open its files.
+    """
+    for path in GENERATION_PATHS:
+        path.unlink(missing_ok=True)
+        pattern = f"{glob.escape(path.stem)}.*{glob.escape(path.suffix)}"
+        for candidate in path.parent.glob(pattern):
+            generation = candidate.name[len(path.stem) + 1:len(candidate.name) - len(path.suffix)]
+            if generation.isdigit() and int(generation) < older_than:
+                candidate.unlink(missing_ok=True)
 
-    if not embeddings:
-        raise ValueError("❌ No valid embeddings generated.")
+# ======================================
+# ✅ Search FAISS
+# ======================================
+def _load_search_state() -> Dict:
+    info = read_index_info()
+    try:
+        return _load_generation(info)
+    except FileNotFoundError:
+        # A rebuild may retire the generation between reading the info file and opening its artifacts
+        latest = read_index_info()
+        if latest == info:
+            raise
+        return _load_generation(latest)
 
-    np_embeddings = np.array(embeddings, dtype=np.float32)
-    index.add(np.ascontiguousarray(np_embeddings))  # type: ignore
 
-    faiss.write_index(index, str(INDEX_PATH))
-    logger.info(f"✅ FAISS index saved to: {INDEX_PATH}")
+def _load_generation(info: Optional[Dict]) -> Dict:
+    generation = info.get("generation") if info else None
+    index_path, metadata_path, exact_store_path, minhash_path, duplicates_path, doc_store_path = (
+        generation_path(path, generation) for path in GENERATION_PATHS
+    )
+    if not index_path.exists() or not metadata_path.exists():
+        raise FileNotFoundError("❌ FAISS index or metadata missing.")
 
-    with METADATA_PATH.open("w", encoding="utf-8") as f:
-        json.dump(valid_metadata, f, indent=2)
+    index = faiss.read_index(str(index_path))
+    info = load_index_info(index, info)
+    with metadata_path.open("r", encoding="utf-8") as f:
+        metadata = json.load(f)
+
+    with doc_store_path.open("r", encoding="utf-8") as f:
+        docs = f.readlines()
+
+    exact_store = vector_storage.open_exact_store(exact_store_path) if info.get("exact_rerank") else None
+
+    signatures = open_signatures(minhash_path, len(metadata)) if settings.dedup_enabled else None
+    duplicates = {}
+    if duplicates_path.exists():
+        with duplicates_path.open("r", encoding="utf-8") as f:
+            duplicates = json.load(f)
+
+    return {
+        "index": index,
+        "info": info,
+        "metadata": metadata,
+        "docs": docs,
+        "exact_store": exact_store,
+        "signatures": signatures,
+        "duplicates": duplicates
+    }
+
+
+def _search_vectors(state: Dict, query_vectors: np.ndarray, top_k: int) -> List[List[Dict]]:
+    """
+    One multi-row FAISS search; returns the matched docs for each query row.
+
+    With MinHash signatures available, candidates are over-fetched and a
+    match that near-duplicates a better-ranked one is folded into that
+    match's ``duplicates`` instead of taking a top-k slot.
+    """
+    signatures = state["signatures"]
+    fetch = top_k * max(1, settings.dedup_search_candidates_factor) if signatures is not None else top_k
+    distances, indices = vector_storage.search(
+        state["index"],
+        query_vectors,
+        fetch,
+        exact_store=state["exact_store"],
+        candidates_factor=settings.rerank_candidates_factor
+    )
+
+    metadata, docs, duplicates = state["metadata"], state["docs"], state["duplicates"]
+    all_matches = []
+    for row in range(len(query_vectors)):
+        matched_docs, matched_rows = [], []
+        for position, idx in enumerate(indices[row]):
+            if not 0 <= idx < len(metadata):
+                continue
+            linked = duplicates.get(str(idx), [])
+
+            if signatures is not None:
+                twin = next(
+                    (match for match, kept in zip(matched_docs, matched_rows)
+                     if similarity(signatures[idx], signatures[kept]) >= settings.dedup_threshold),
+                    None
+                )
+                if twin is not None:
+                    twin["duplicates"].extend([metadata[idx], *linked])
+                    continue
+
+            if len(matched_docs) == top_k:
+                break
+            matched_docs.append({
+                "rank": len(matched_docs) + 1,
+                "score": float(distances[row][position]),
+                "metadata": metadata[idx],
+                "text": docs[idx].strip(),
+                "duplicates": list(linked)
+            })
+            matched_rows.append(idx)
+        all_matches.append(matched_docs)
+    return all_matches
 
-    with DOC_STORE_PATH.open("w", encoding="utf-8") as f:
-        for doc in texts[:len(valid_metadata)]:
-            f.write(doc.replace("\n", " ") + "\n")
 
-# ======================================
-# ✅ Search FAISS
-# ======================================
 def search_similar_texts(query: str, top_k: int = 5) -> Dict:
-    if not INDEX_PATH.exists() or not METADATA_PATH.exists():
-        raise FileNotFoundError("❌ FAISS index or metadata missing.")
+    state = _load_search_state()
 
     try:
-        index = faiss.read_index(str(INDEX_PATH))
-        with METADATA_PATH.open("r", encoding="utf-8") as f:
-            metadata = json.load(f)
-
-        with DOC_STORE_PATH.open("r", encoding="utf-8") as f:
-            docs = f.readlines()
-
-        query_vector = embed_text(query)
-        distances, indices = index.search(np.array([query_vector], dtype=np.float32), top_k)
-
-        matched_docs = []
-        for rank, idx in enumerate(indices[0]):
-            if idx < len(metadata):
-                matched_docs.append({
-                    "rank": rank + 1,
-                    "score": float(distances[0][rank]),
-                    "metadata": metadata[idx],
-                    "text": docs[idx].strip()
-                })
+        query_vector = embed_text(query, state["info"])
+        matched_docs = _search_vectors(state, np.array([query_vector], dtype=np.float32), top_k)[0]
 
         logger.info(f"🔍 Found {len(matched_docs)} relevant docs.")
 
@@ -172,10 +427,40 @@ def search_similar_texts(query: str, top_k: int = 5) -> Dict:
             "ai_summary": ai_summary
         }
 
+    except EmbeddingUnavailableError:
+        # The embedder is down or stuck: let the route answer 503
+        raise
+
     except Exception as e:
         logger.error(f"❌ Search failed: {e}")
         return {
             "query": query,
             "results": [],
             "ai_summary": "⚠️ AI summary generation failed due to internal error."
-        }
\ No newline at end of file
+        }
+
+
+def search_similar_texts_batch(queries: List[str], top_k: int = 5, include_answers: bool = False) -> List[Dict]:
+    """
+    Search many queries at once: one batched embedding call, one multi-row
+    FAISS search and, optionally, concurrently generated AI answers.
+    """
+    state = _load_search_state()
+
+    query_vectors = embedder_for_index(state["info"]).embed(queries)
+    all_matches = _search_vectors(state, query_vectors, top_k)
+    logger.info(f"🔍 Batch search: {len(queries)} queries, top_k={top_k}.")
+
+    answers: List[Optional[str]] = [None] * len(queries)
+    if include_answers:
+        workers = max(1, min(settings.batch_answer_concurrency, len(queries)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            answers = list(pool.map(
+                lambda pair: generate_ai_answer(pair[0], [doc["text"] for doc in pair[1]]),
+                zip(queries, all_matches)
+            ))
+
+    return [
+        {"query": query, "results": matches, "ai_summary": answer}
+        for query, matches, answer in zip(queries, all_matches, answers)
+    ]
\ No newline at end of file
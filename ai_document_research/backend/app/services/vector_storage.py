@@ -0,0 +1,137 @@
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import logging
+import numpy as np
+import faiss
+
+logger = logging.getLogger(__name__)
+
+FLAT = "flat"
+FP16 = "fp16"
+SQ8 = "sq8"
+PQ = "pq"
+STORAGE_TYPES = (FLAT, FP16, SQ8, PQ)
+
+# Training on more vectors than this only slows the build down
+MAX_TRAINING_VECTORS = 65536
+# Rows copied per step when adding to the index or writing the exact store
+ADD_CHUNK_ROWS = 16384
+
+
+def bytes_per_vector(storage: str, dim: int, pq_m: int = 0, pq_bits: int = 8) -> float:
+    if storage == FP16:
+        return dim * 2
+    if storage == SQ8:
+        return dim
+    if storage == PQ:
+        return pq_m * pq_bits / 8
+    return dim * 4
+
+
+def default_pq_m(dim: int) -> int:
+    """Largest sub-quantizer count ≤ dim/16 that divides dim (96 for 1536, 24 for 384)."""
+    m = max(1, dim // 16)
+    while dim % m:
+        m -= 1
+    return m
+
+
+# ======================================
+# ✅ Index Factory
+# ======================================
+def create_index(vectors: np.ndarray, storage: str = FLAT, pq_m: int = 0, pq_bits: int = 8) -> Tuple[faiss.Index, Dict]:
+    """
+    Build (and train, where needed) a FAISS index holding ``vectors``.
+
+    Returns the index plus a description of the storage actually used, which
+    may differ from the request: PQ needs at least 2**pq_bits training
+    vectors and falls back to SQ8 on smaller corpora.
+    """
+    if storage not in STORAGE_TYPES:
+        raise ValueError(f"❌ Unknown vector storage '{storage}'. Use one of: {', '.join(STORAGE_TYPES)}")
+
+    n, dim = vectors.shape
+    if storage == PQ:
+        pq_m = pq_m or default_pq_m(dim)
+        if dim % pq_m:
+            raise ValueError(f"❌ PQ sub-quantizers ({pq_m}) must divide the embedding dim ({dim}).")
+        if n < 2 ** pq_bits:
+            logger.warning(f"⚠️ {n} vectors are too few to train PQ ({2 ** pq_bits} needed); using sq8.")
+            storage = SQ8
+
+    if storage == FP16:
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_fp16, faiss.METRIC_L2)
+    elif storage == SQ8:
+        index = faiss.IndexScalarQuantizer(dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_L2)
+    elif storage == PQ:
+        index = faiss.IndexPQ(dim, pq_m, pq_bits, faiss.METRIC_L2)
+    else:
+        index = faiss.IndexFlatL2(dim)
+
+    if not index.is_trained:
+        if n > MAX_TRAINING_VECTORS:
+            sample = np.sort(np.random.default_rng(0).choice(n, MAX_TRAINING_VECTORS, replace=False))
+            index.train(np.ascontiguousarray(vectors[sample], dtype=np.float32))  # type: ignore
+        else:
+            index.train(np.ascontiguousarray(vectors, dtype=np.float32))  # type: ignore
+
+    # Chunked adds keep memory flat when ``vectors`` is memory-mapped
+    for start in range(0, n, ADD_CHUNK_ROWS):
+        index.add(np.ascontiguousarray(vectors[start:start + ADD_CHUNK_ROWS], dtype=np.float32))  # type: ignore
+
+    description = {
+        "type": storage,
+        "bytes_per_vector": bytes_per_vector(storage, dim, pq_m, pq_bits),
+    }
+    if storage == PQ:
+        description.update({"pq_m": pq_m, "pq_bits": pq_bits})
+    return index, description
+
+
+# ======================================
+# ✅ Exact Float32 Store (for re-ranking)
+# ======================================
+def write_exact_store(vectors: np.ndarray, path: Path) -> None:
+    """Persist full-precision vectors as .npy so queries can memory-map them."""
+    tmp_path = path.with_name(path.name + ".tmp")
+    out = np.lib.format.open_memmap(str(tmp_path), mode="w+", dtype=np.float32, shape=vectors.shape)
+    for start in range(0, len(vectors), ADD_CHUNK_ROWS):
+        out[start:start + ADD_CHUNK_ROWS] = vectors[start:start + ADD_CHUNK_ROWS]
+    out.flush()
+    del out
+    tmp_path.replace(path)
+
+
+def open_exact_store(path: Path) -> Optional[np.ndarray]:
+    if not path.exists():
+        return None
+    return np.load(str(path), mmap_mode="r")
+
+
+def search(index: faiss.Index, queries: np.ndarray, top_k: int,
+           exact_store: Optional[np.ndarray] = None, candidates_factor: int = 4) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Search ``index``; with an ``exact_store`` over-fetch candidates from the
+    compressed index and re-rank them by exact L2 distance read from disk.
+    """
+    queries = np.ascontiguousarray(queries, dtype=np.float32)
+    if exact_store is None:
+        return index.search(queries, top_k)  # type: ignore
+
+    fetch = min(index.ntotal, max(top_k, top_k * candidates_factor))
+    _, candidates = index.search(queries, fetch)  # type: ignore
+
+    distances = np.full((len(queries), top_k), np.inf, dtype=np.float32)
+    indices = np.full((len(queries), top_k), -1, dtype=np.int64)
+    for row, (query, ids) in enumerate(zip(queries, candidates)):
+        ids = ids[ids >= 0]
+        if not ids.size:
+            continue
+        # Sorted ids keep the memory-mapped reads sequential
+        ids = np.sort(ids)
+        exact = np.asarray(exact_store[ids], dtype=np.float32)
+        d = ((exact - query) ** 2).sum(axis=1)
+        order = np.argsort(d)[:top_k]
+        distances[row, :len(order)] = d[order]
+        indices[row, :len(order)] = ids[order]
+    return distances, indices
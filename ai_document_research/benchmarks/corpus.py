@@ -0,0 +1,160 @@
+"""Synthetic, seeded document corpora for the benchmark suite."""
+
+import random
+from pathlib import Path
+from typing import Dict, List
+
+from docx import Document
+from fpdf import FPDF
+from PIL import Image, ImageDraw
+
+TOPICS = {
+    "ai": "model neural network training inference embedding vector transformer dataset accuracy gradient",
+    "finance": "invoice payment budget revenue forecast ledger audit balance quarterly expense",
+    "legal": "contract clause party agreement liability termination warranty jurisdiction notice signature",
+    "health": "patient diagnosis treatment clinical dosage symptom therapy hospital record prescription",
+    "energy": "solar grid battery turbine power storage emission voltage renewable capacity",
+}
+FILLER = "the of and to in for with on by from this that report section summary review".split()
+
+
+def synthetic_texts(count: int, words_per_doc: int = 200, seed: int = 42) -> List[str]:
+    """Topic-flavoured pseudo-documents; the same seed always yields the same corpus."""
+    rng = random.Random(seed)
+    topics = list(TOPICS)
+    texts = []
+    for i in range(count):
+        topic = topics[i % len(topics)]
+        vocab = TOPICS[topic].split()
+        words = [rng.choice(vocab) if rng.random() < 0.6 else rng.choice(FILLER) for _ in range(words_per_doc)]
+        texts.append(f"Document {i} about {topic}. " + " ".join(words) + ".")
+    return texts
+
+
+def synthetic_queries(count: int, seed: int = 7) -> List[str]:
+    rng = random.Random(seed)
+    topics = list(TOPICS)
+    queries = []
+    for _ in range(count):
+        vocab = TOPICS[rng.choice(topics)].split()
+        queries.append(" ".join(rng.sample(vocab, 4)))
+    return queries
+
+
+def _paragraphs(text: str, words_per_paragraph: int = 40) -> List[str]:
+    words = text.split()
+    return [" ".join(words[i:i + words_per_paragraph]) for i in range(0, len(words), words_per_paragraph)]
+
+
+def write_txt(text: str, path: Path) -> Path:
+    path.write_text(text, encoding="utf-8")
+    return path
+
+
+def write_docx(text: str, path: Path) -> Path:
+    doc = Document()
+    doc.add_heading("Synthetic benchmark document", level=1)
+    for para in _paragraphs(text):
+        doc.add_paragraph(para)
+
+    table = doc.add_table(rows=3, cols=3)
+    for r, row in enumerate(table.rows):
+        for c, cell in enumerate(row.cells):
+            cell.text = f"cell {r}-{c}"
+
+    doc.save(str(path))
+    return path
+
+
+def write_long_docx(path: Path, pages: int, seed: int = 42) -> Path:
+    """Roughly ``pages`` pages: three paragraphs and a small table per page, plus header and footer."""
+    doc = Document()
+    doc.sections[0].header.paragraphs[0].text = "Synthetic benchmark report"
+    doc.sections[0].footer.paragraphs[0].text = "Confidential"
+    for page, text in enumerate(synthetic_texts(pages, words_per_doc=330, seed=seed)):
+        doc.add_heading(f"Section {page + 1}", level=2)
+        for para in _paragraphs(text, words_per_paragraph=110):
+            doc.add_paragraph(para)
+        table = doc.add_table(rows=3, cols=3)
+        for r, row in enumerate(table.rows):
+            for c, cell in enumerate(row.cells):
+                cell.text = f"page {page} cell {r}-{c}"
+    doc.save(str(path))
+    return path
+
+
+def write_nested_table_docx(path: Path) -> Path:
+    """A table whose first cell holds text, a nested table, then more text."""
+    doc = Document()
+    doc.add_paragraph("before table")
+    left, right = doc.add_table(rows=1, cols=2).rows[0].cells
+    left.paragraphs[0].text = "outer before"
+    inner = left.add_table(rows=1, cols=2)
+    inner.rows[0].cells[0].text = "inner a"
+    inner.rows[0].cells[1].text = "inner b"
+    left.add_paragraph("outer after")
+    right.text = "right"
+    doc.add_paragraph("after table")
+    doc.save(str(path))
+    return path
+
+
+def write_text_pdf(text: str, path: Path) -> Path:
+    pdf = FPDF(format="A4")
+    pdf.add_page()
+    pdf.set_auto_page_break(auto=True, margin=15)
+    pdf.set_font("Helvetica", size=11)
+    for para in _paragraphs(text):
+        pdf.multi_cell(0, 6, para)
+        pdf.ln(2)
+    pdf.output(str(path))
+    return path
+
+
+def render_text_image(text: str, width: int = 1700, height: int = 2200, font_size: int = 28,
+                      background="white") -> Image.Image:
+    """Black-on-white page roughly resembling a 200 DPI scan."""
+    image = Image.new("RGB", (width, height), background)
+    draw = ImageDraw.Draw(image)
+    margin, line_height = font_size * 3, int(font_size * 1.6)
+    words_per_line = max(4, int((width - 2 * margin) / (font_size * 3.2)))
+    y = margin
+    for para in _paragraphs(text, words_per_paragraph=words_per_line):
+        if y > height - margin:
+            break
+        draw.text((margin, y), para, fill="black", font_size=font_size)
+        y += line_height
+    return image
+
+
+def render_photo(text: str, width: int = 4032, height: int = 3024, seed: int = 0) -> Image.Image:
+    """A 12 MP 'camera photo' of a page: off-white, uneven lighting, sensor noise."""
+    page = render_text_image(text, width, height, font_size=72, background=(225, 222, 210))
+    noise = Image.effect_noise((width, height), 18).convert("RGB")
+    shade = Image.linear_gradient("L").resize((width, height)).convert("RGB")
+    photo = Image.blend(page, noise, 0.12)
+    return Image.blend(photo, shade, 0.08 + 0.02 * (seed % 3))
+
+
+def write_image(text: str, path: Path) -> Path:
+    render_text_image(text).save(str(path))
+    return path
+
+
+def write_scanned_pdf(text: str, path: Path, pages: int = 2) -> Path:
+    images = [render_text_image(text) for _ in range(pages)]
+    images[0].save(str(path), "PDF", resolution=200.0, save_all=True, append_images=images[1:])
+    return path
+
+
+def build_file_corpus(out_dir: Path, seed: int = 42) -> Dict[str, Path]:
+    """One sample file per input kind used by the conversion benchmarks."""
+    out_dir.mkdir(parents=True, exist_ok=True)
+    text = synthetic_texts(1, words_per_doc=600, seed=seed)[0]
+    return {
+        "txt": write_txt(text, out_dir / "sample.txt"),
+        "docx": write_docx(text, out_dir / "sample.docx"),
+        "pdf": write_text_pdf(text, out_dir / "sample.pdf"),
+        "scanned_pdf": write_scanned_pdf(text, out_dir / "scanned.pdf"),
+        "png": write_image(text, out_dir / "sample.png"),
+    }
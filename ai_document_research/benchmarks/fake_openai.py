@@ -0,0 +1,155 @@
+"""Local, deterministic stand-in for the OpenAI embeddings and chat APIs.
+
+Point the app at it with ``OPENAI_BASE_URL=http://127.0.0.1:<port>/v1``.
+Embeddings are hashed bag-of-words vectors, so identical texts always get
+identical vectors and texts sharing words land close together.
+"""
+
+import base64
+import json
+import re
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+
+EMBEDDING_DIM = 1536
+TOKEN_RE = re.compile(r"\w+")
+
+
+def fake_embedding(text: str, dim: int = EMBEDDING_DIM) -> np.ndarray:
+    """Deterministic unit-length embedding built with the hashing trick."""
+    vec = np.zeros(dim, dtype=np.float32)
+    for token in TOKEN_RE.findall(text.lower()):
+        h = zlib.crc32(token.encode("utf-8"))
+        vec[h % dim] += 1.0 if (h >> 31) & 1 else -1.0
+    norm = float(np.linalg.norm(vec))
+    if norm == 0.0:
+        vec[0] = 1.0
+        return vec
+    return vec / norm
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    server: "FakeOpenAIServer"
+
+    def log_message(self, format, *args):  # noqa: A002 - silence stdlib access log
+        pass
+
+    def _send_json(self, status: int, payload: dict) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_POST(self):
+        length = int(self.headers.get("Content-Length", 0))
+        payload = json.loads(self.rfile.read(length) or b"{}")
+
+        if self.server.latency_s:
+            time.sleep(self.server.latency_s)
+
+        path = self.path.rstrip("/")
+        if path.endswith("/embeddings"):
+            self._send_json(200, self._embeddings(payload))
+        elif path.endswith("/chat/completions"):
+            self._send_json(200, self._chat(payload))
+        else:
+            self._send_json(404, {"error": {"message": f"Unknown path {self.path}"}})
+
+    def _embeddings(self, payload: dict) -> dict:
+        inputs = payload.get("input", [])
+        if isinstance(inputs, str):
+            inputs = [inputs]
+        as_base64 = payload.get("encoding_format") == "base64"
+        self.server.count("embeddings", len(inputs))
+
+        data = []
+        for i, text in enumerate(inputs):
+            vec = fake_embedding(str(text), self.server.dim)
+            embedding = base64.b64encode(vec.astype("<f4").tobytes()).decode("ascii") if as_base64 else vec.tolist()
+            data.append({"object": "embedding", "index": i, "embedding": embedding})
+
+        tokens = sum(len(TOKEN_RE.findall(str(t))) for t in inputs)
+        return {
+            "object": "list",
+            "data": data,
+            "model": payload.get("model", "fake-embedding"),
+            "usage": {"prompt_tokens": tokens, "total_tokens": tokens},
+        }
+
+    def _chat(self, payload: dict) -> dict:
+        messages = payload.get("messages", [])
+        prompt = " ".join(str(m.get("content", "")) for m in messages)
+        prompt_tokens = len(TOKEN_RE.findall(prompt))
+        self.server.count("chat", 1)
+        answer = f"Fake answer based on {prompt_tokens} prompt tokens."
+        return {
+            "id": f"chatcmpl-fake-{zlib.crc32(prompt.encode('utf-8')):08x}",
+            "object": "chat.completion",
+            "created": 0,
+            "model": payload.get("model", "fake-chat"),
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": answer},
+                "finish_reason": "stop",
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": 8,
+                "total_tokens": prompt_tokens + 8,
+            },
+        }
+
+
+class FakeOpenAIServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, dim: int = EMBEDDING_DIM, latency_ms: float = 0.0):
+        super().__init__((host, port), FakeOpenAIHandler)
+        self.dim = dim
+        self.latency_s = latency_ms / 1000.0
+        self.calls = {"embeddings": 0, "embedded_inputs": 0, "chat": 0}
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def count(self, kind: str, inputs: int) -> None:
+        with self._lock:
+            self.calls[kind] += 1
+            if kind == "embeddings":
+                self.calls["embedded_inputs"] += inputs
+
+    def start(self) -> "FakeOpenAIServer":
+        self._thread = threading.Thread(target=self.serve_forever, name="fake-openai", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve fake OpenAI embeddings and chat completions.")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--dim", type=int, default=EMBEDDING_DIM)
+    parser.add_argument("--latency-ms", type=float, default=0.0)
+    args = parser.parse_args()
+
+    server = FakeOpenAIServer(port=args.port, dim=args.dim, latency_ms=args.latency_ms)
+    print(f"🧪 Fake OpenAI listening on {server.base_url}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        server.server_close()
@@ -0,0 +1,110 @@
+"""
+OCR time per image and text accuracy: raw pytesseract vs the preprocessing
+pipeline, plus engine throughput (one call per image vs the pooled/batched
+``ocr_engine``) on already-preprocessed images.
+"""
+
+import difflib
+import re
+import time
+from pathlib import Path
+from typing import Dict
+
+from benchmarks.corpus import render_photo, render_text_image, synthetic_texts
+
+WORD_RE = re.compile(r"\w+")
+
+
+def word_accuracy(truth: str, ocr_text: str) -> float:
+    """Fraction of ground-truth words recovered in order (1.0 = perfect)."""
+    expected = WORD_RE.findall(truth.lower())
+    found = WORD_RE.findall(ocr_text.lower())
+    if not expected:
+        return 1.0
+    matcher = difflib.SequenceMatcher(a=expected, b=found, autojunk=False)
+    return sum(block.size for block in matcher.get_matching_blocks()) / len(expected)
+
+
+def build_image_set(out_dir: Path, count: int) -> Dict[Path, str]:
+    """
+    12 MP JPEG photos (untagged and tagged with the usual 72 DPI camera
+    placeholder) and 300 DPI PNG scans; maps each file to its ground truth.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    images = {}
+    for i, text in enumerate(synthetic_texts(count, words_per_doc=120, seed=99)):
+        if i % 3 == 0:
+            path = out_dir / f"photo_{i}.jpg"
+            render_photo(text, seed=i).save(str(path), quality=90)
+        elif i % 3 == 1:
+            path = out_dir / f"photo_72dpi_{i}.jpg"
+            render_photo(text, seed=i).save(str(path), quality=90, dpi=(72, 72))
+        else:
+            path = out_dir / f"scan_{i}.png"
+            render_text_image(text, 2550, 3300, font_size=40).save(str(path), dpi=(300, 300))
+        images[path] = text
+    return images
+
+
+def bench_ocr(work_dir: Path, count: int) -> Dict:
+    import pytesseract
+    from PIL import Image
+    from app.services.ocr_engine import get_ocr_engine, ocr_images
+    from app.services.ocr_service import load_image_for_ocr, ocr_image
+
+    images = build_image_set(work_dir / "ocr_images", count)
+
+    # Size fed to Tesseract per input kind; needs no tesseract binary
+    results = {"preprocessed_sizes": {}}
+    for path in images:
+        kind = path.stem.rsplit("_", 1)[0]
+        if kind not in results["preprocessed_sizes"]:
+            with Image.open(path) as img:
+                original = img.size
+            prepared = load_image_for_ocr(path)
+            results["preprocessed_sizes"][kind] = {"original": list(original), "preprocessed": list(prepared.size)}
+            print(f"🖼️ OCR input {kind:<12} {original[0]}x{original[1]} -> {prepared.size[0]}x{prepared.size[1]}")
+
+    def raw_path(path: Path) -> str:
+        with Image.open(path) as img:
+            return pytesseract.image_to_string(img)
+
+    for name, fn in (("raw", raw_path), ("preprocessed", ocr_image)):
+        seconds, accuracy = [], []
+        try:
+            for path, truth in images.items():
+                start = time.perf_counter()
+                text = fn(path)
+                seconds.append(time.perf_counter() - start)
+                accuracy.append(word_accuracy(truth, text))
+        except pytesseract.TesseractNotFoundError as e:
+            return {**results, "error": f"tesseract not available: {e}"}
+
+        results[name] = {
+            "images": len(seconds),
+            "mean_ms": round(sum(seconds) / len(seconds) * 1000.0, 1),
+            "images_per_sec": round(len(seconds) / sum(seconds), 3),
+            "word_accuracy": round(sum(accuracy) / len(accuracy), 4),
+        }
+        print(f"🖼️ OCR {name:<13} {results[name]['mean_ms']:8.1f} ms/image "
+              f"accuracy={results[name]['word_accuracy']:.3f}")
+
+    # Engine throughput on identical, preprocessed inputs
+    prepared = [load_image_for_ocr(path) for path in images]
+    truths = list(images.values())
+    for name, run in (
+        ("per_call", lambda: [pytesseract.image_to_string(img).strip() for img in prepared]),
+        ("engine_" + get_ocr_engine().name, lambda: ocr_images(prepared)),
+    ):
+        start = time.perf_counter()
+        texts = run()
+        elapsed = time.perf_counter() - start
+        results[name] = {
+            "images": len(prepared),
+            "mean_ms": round(elapsed / len(prepared) * 1000.0, 1),
+            "images_per_sec": round(len(prepared) / elapsed, 3),
+            "word_accuracy": round(sum(map(word_accuracy, truths, texts)) / len(texts), 4),
+        }
+        print(f"🖼️ OCR {name:<13} {results[name]['mean_ms']:8.1f} ms/image "
+              f"({results[name]['images_per_sec']:.2f} images/s)")
+    return results
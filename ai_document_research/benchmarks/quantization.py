@@ -0,0 +1,60 @@
+"""Memory footprint and recall of each vector storage option against exact float32 search."""
+
+import time
+from typing import Dict
+
+import faiss
+import numpy as np
+
+from benchmarks.corpus import synthetic_queries, synthetic_texts
+from benchmarks.fake_openai import fake_embedding
+
+
+def recall_at_k(truth: np.ndarray, found: np.ndarray) -> float:
+    hits = sum(len(set(t) & set(f)) for t, f in zip(truth, found))
+    return hits / truth.size
+
+
+def bench_quantization(size: int, queries: int, top_k: int, work_dir) -> Dict[str, Dict]:
+    from app.services import vector_storage
+
+    vectors = np.vstack([fake_embedding(t) for t in synthetic_texts(size)])
+    query_vectors = np.vstack([fake_embedding(q) for q in synthetic_queries(queries)])
+
+    exact_index, _ = vector_storage.create_index(vectors, vector_storage.FLAT)
+    _, truth = exact_index.search(query_vectors, top_k)
+
+    store_path = work_dir / "quant_store_f32.npy"
+    vector_storage.write_exact_store(vectors, store_path)
+    exact_store = vector_storage.open_exact_store(store_path)
+
+    results = {}
+    for storage in vector_storage.STORAGE_TYPES:
+        start = time.perf_counter()
+        index, description = vector_storage.create_index(vectors, storage)
+        build_s = time.perf_counter() - start
+        index_bytes = faiss.serialize_index(index).nbytes
+
+        for rerank in ([False] if storage == vector_storage.FLAT else [False, True]):
+            store = exact_store if rerank else None
+            start = time.perf_counter()
+            for q in query_vectors:
+                vector_storage.search(index, q[None, :], top_k, exact_store=store)
+            per_query_ms = (time.perf_counter() - start) / len(query_vectors) * 1000.0
+            _, found = vector_storage.search(index, query_vectors, top_k, exact_store=store)
+
+            row = {
+                "storage": description["type"],
+                "exact_rerank": rerank,
+                "corpus_size": size,
+                "index_bytes": int(index_bytes),
+                "index_bytes_per_vector": round(index_bytes / size, 1),
+                "disk_bytes_per_vector_rerank": vectors.shape[1] * 4 if rerank else 0,
+                "build_seconds": round(build_s, 3),
+                "mean_ms": round(per_query_ms, 3),
+                f"recall_at_{top_k}": round(recall_at_k(truth, found), 4),
+            }
+            results[row["storage"] + ("_rerank" if rerank else "")] = row
+            print(f"🗜️ {row['storage']:<5} rerank={str(rerank):<5} {row['index_bytes_per_vector']:>8.1f} B/vec "
+                  f"recall@{top_k}={row[f'recall_at_{top_k}']:.3f} {per_query_ms:.2f}ms/query")
+    return results
@@ -0,0 +1,423 @@
+"""Offline benchmark suite for indexing, search, conversion and the HTTP API.
+
+Usage (from ``ai_document_research/``)::
+
+    python -m benchmarks.run --output bench.json
+    python -m benchmarks.run --output new.json --baseline bench.json
+
+All OpenAI traffic goes to the local stand-in in ``benchmarks/fake_openai.py``,
+so results are reproducible and no API key or network access is needed.
+"""
+
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, List
+
+import numpy as np
+
+from benchmarks.corpus import build_file_corpus, synthetic_queries, synthetic_texts
+from benchmarks.docx import bench_docx
+from benchmarks.fake_openai import FakeOpenAIServer
+from benchmarks.ocr import bench_ocr
+from benchmarks.quantization import bench_quantization
+
+BACKEND_DIR = Path(__file__).resolve().parents[1] / "backend"
+
+# max_ms is reported but too noisy to gate on
+COMPARED_METRICS = {"mean_ms", "p50_ms", "p99_ms", "docs_per_sec", "requests_per_sec", "images_per_sec"}
+
+CONVERSIONS = [
+    ("txt", "pdf"),
+    ("docx", "pdf"),
+    ("pdf", "txt"),
+    ("pdf", "docx"),
+    ("pdf", "jpg"),
+    ("scanned_pdf", "txt"),
+    ("png", "pdf"),
+    ("png", "txt"),
+]
+
+
+# -------------------------------
+# ✅ Helpers
+# -------------------------------
+def latency_stats(samples_s: List[float]) -> Dict[str, float]:
+    ms = np.asarray(samples_s, dtype=np.float64) * 1000.0
+    return {
+        "count": int(ms.size),
+        "mean_ms": round(float(ms.mean()), 3),
+        "p50_ms": round(float(np.percentile(ms, 50)), 3),
+        "p99_ms": round(float(np.percentile(ms, 99)), 3),
+        "max_ms": round(float(ms.max()), 3),
+    }
+
+
+def timed(fn: Callable, repeat: int) -> List[float]:
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def configure_environment(fake: FakeOpenAIServer, work_dir: Path, log_level: str, offline: bool, storage: str) -> None:
+    """Point settings, the OpenAI client and all data paths at throwaway locations."""
+    data_dir = work_dir / "data"
+    os.environ.update({
+        "OPENAI_API_KEY": "sk-benchmark-0000000000000000",
+        "OPENAI_BASE_URL": fake.base_url,
+        "VECTOR_INDEX_PATH": str(data_dir / "vector_index.index"),
+        "VECTOR_METADATA_PATH": str(data_dir / "vector_metadata.json"),
+        "VECTOR_INDEX_INFO_PATH": str(data_dir / "vector_index_info.json"),
+        "VECTOR_EXACT_STORE_PATH": str(data_dir / "vector_store_f32.npy"),
+        "VECTOR_MINHASH_PATH": str(data_dir / "vector_minhash.npy"),
+        "VECTOR_DUPLICATES_PATH": str(data_dir / "vector_duplicates.json"),
+        "DOC_STORE_PATH": str(data_dir / "doc_store.txt"),
+        "UPLOAD_DIR": str(data_dir / "uploads"),
+        "CONVERT_DIR": str(data_dir / "converted"),
+        "PROCESSED_DIR": str(data_dir / "processed"),
+        "LOG_FILE": str(work_dir / "logs" / "app.log"),
+        "LOG_LEVEL": log_level,
+        "OFFLINE_MODE": "true" if offline else "false",
+        "VECTOR_STORAGE": storage,
+    })
+    data_dir.mkdir(parents=True, exist_ok=True)
+    sys.path.insert(0, str(BACKEND_DIR))
+    # Phases before app.main is imported log through this; setup_logging replaces it.
+    logging.basicConfig(level=log_level)
+
+
+# -------------------------------
+# ✅ Index build + search
+# -------------------------------
+def bench_build_and_search(sizes: List[int], queries: int, top_k: int) -> Dict:
+    from app.services.vector_service import (
+        build_faiss_index_from_texts,
+        search_similar_texts,
+        search_similar_texts_batch,
+    )
+
+    build_results, search_results = [], []
+    query_texts = synthetic_queries(queries)
+
+    for size in sizes:
+        texts = synthetic_texts(size)
+        metadata = [f"doc_{i}.txt" for i in range(size)]
+
+        start = time.perf_counter()
+        build_stats = build_faiss_index_from_texts(texts, metadata)
+        elapsed = time.perf_counter() - start
+        build_results.append({
+            "corpus_size": size,
+            "seconds": round(elapsed, 3),
+            "docs_per_sec": round(size / elapsed, 2),
+            "duplicates": build_stats["dedup"].get("duplicates", 0),
+        })
+        print(f"🧠 build  n={size:<6} {size / elapsed:10.1f} docs/sec")
+
+        samples = []
+        for q in query_texts:
+            start = time.perf_counter()
+            result = search_similar_texts(q, top_k)
+            samples.append(time.perf_counter() - start)
+            if not result["results"]:
+                raise RuntimeError(f"Search returned no results for {q!r} at n={size}")
+
+        stats = latency_stats(samples)
+
+        start = time.perf_counter()
+        search_similar_texts_batch(query_texts, top_k)
+        batch_per_query_ms = (time.perf_counter() - start) / len(query_texts) * 1000.0
+
+        search_results.append({
+            "corpus_size": size,
+            "top_k": top_k,
+            **stats,
+            "batch": {"batch_size": len(query_texts), "mean_ms": round(batch_per_query_ms, 3)},
+        })
+        print(f"🔍 search n={size:<6} p50={stats['p50_ms']:.2f}ms p99={stats['p99_ms']:.2f}ms "
+              f"batch={batch_per_query_ms:.2f}ms/query")
+
+    return {"build": build_results, "search": search_results}
+
+
+def bench_concurrent_query_embedding(fake: FakeOpenAIServer, queries: int, threads: int) -> Dict:
+    """Many threads embedding single queries at once, with and without micro-batching."""
+    from app.config.settings import settings
+    from app.services.vector_service import embed_text
+
+    query_texts = synthetic_queries(queries, seed=11)
+    results = {}
+    for batching in (False, True):
+        settings.query_batching = batching
+        calls_before = fake.calls["embeddings"]
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            list(pool.map(embed_text, query_texts[:threads]))  # warm-up
+            calls_before = fake.calls["embeddings"]
+            start = time.perf_counter()
+            list(pool.map(embed_text, query_texts))
+            elapsed = time.perf_counter() - start
+
+        name = "batched" if batching else "unbatched"
+        results[name] = {
+            "queries": len(query_texts),
+            "threads": threads,
+            "requests_per_sec": round(len(query_texts) / elapsed, 2),
+            "embedding_calls": fake.calls["embeddings"] - calls_before,
+        }
+        print(f"🧮 query embed {name:<9} {results[name]['requests_per_sec']:8.1f} q/s "
+              f"embedding calls={results[name]['embedding_calls']}")
+    return results
+
+
+# -------------------------------
+# ✅ Conversions
+# -------------------------------
+def bench_conversions(work_dir: Path, repeat: int) -> Dict:
+    from app.services import conversion_service
+    from app.services.storage_service import release
+
+    files = build_file_corpus(work_dir / "corpus")
+
+    results = {}
+    for source, target in CONVERSIONS:
+        name = f"{source}_to_{target}"
+        input_path = files[source]
+        failures = 0
+
+        def convert():
+            nonlocal failures
+            output = conversion_service.handle_conversion_to_format(input_path, target)
+            if output is None:
+                failures += 1
+            else:
+                release(output)
+
+        samples = timed(convert, repeat)
+
+        if failures == repeat:
+            results[name] = {"error": "conversion failed (missing system dependency?)"}
+            print(f"🔁 {name:<20} failed")
+            continue
+
+        results[name] = {**latency_stats(samples), "failures": failures}
+        print(f"🔁 {name:<20} p50={results[name]['p50_ms']:.1f}ms")
+
+    return results
+
+
+# -------------------------------
+# ✅ End-to-end HTTP throughput
+# -------------------------------
+def start_api_server(port: int):
+    import uvicorn
+    from app.main import app
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, name="bench-api", daemon=True)
+    thread.start()
+    deadline = time.time() + 30
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError("API server did not start in time")
+        time.sleep(0.05)
+    return server, thread
+
+
+def load_test(base_url: str, make_request: Callable, requests: int, concurrency: int) -> Dict:
+    import httpx
+
+    samples: List[float] = []
+    statuses: Dict[str, int] = {}
+    lock = threading.Lock()
+
+    def worker(n: int):
+        with httpx.Client(base_url=base_url, timeout=60.0) as client:
+            for _ in range(n):
+                start = time.perf_counter()
+                try:
+                    status = make_request(client).status_code
+                except httpx.TransportError:
+                    status = "transport_error"
+                elapsed = time.perf_counter() - start
+                with lock:
+                    samples.append(elapsed)
+                    statuses[str(status)] = statuses.get(str(status), 0) + 1
+
+    per_worker = [requests // concurrency + (1 if i < requests % concurrency else 0) for i in range(concurrency)]
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, per_worker))
+    wall = time.perf_counter() - start
+
+    return {
+        "concurrency": concurrency,
+        "requests_per_sec": round(len(samples) / wall, 2),
+        "status_codes": statuses,
+        **latency_stats(samples),
+    }
+
+
+def bench_http(work_dir: Path, port: int, requests: int, concurrency: int) -> Dict:
+    txt_payload = (work_dir / "corpus" / "sample.txt").read_bytes()
+    query = synthetic_queries(1)[0]
+    batch_queries = synthetic_queries(20)
+
+    scenarios = {
+        "health": lambda c: c.get("/api/health/"),
+        "search": lambda c: c.get("/api/ai/search", params={"query": query, "top_k": 5}),
+        "search_batch_20": lambda c: c.post("/api/ai/search-batch", json={"queries": batch_queries, "top_k": 5}),
+        "convert_txt_to_pdf": lambda c: c.post(
+            "/api/convert/convert",
+            files={"file": ("sample.txt", txt_payload, "text/plain")},
+            data={"target_format": "pdf"},
+        ),
+    }
+
+    server, thread = start_api_server(port)
+    base_url = f"http://127.0.0.1:{port}"
+    results = {}
+    try:
+        for name, make_request in scenarios.items():
+            results[name] = load_test(base_url, make_request, requests, concurrency)
+            print(f"🌐 {name:<20} {results[name]['requests_per_sec']:8.1f} req/s "
+                  f"p99={results[name]['p99_ms']:.1f}ms {results[name]['status_codes']}")
+    finally:
+        server.should_exit = True
+        thread.join(timeout=10)
+    return results
+
+
+# -------------------------------
+# ✅ Baseline comparison
+# -------------------------------
+def flatten_metrics(results: Dict, prefix: str = "") -> Dict[str, float]:
+    flat = {}
+    if isinstance(results, dict):
+        items = results.items()
+    elif isinstance(results, list):
+        items = ((str(r.get("corpus_size", i)), r) for i, r in enumerate(results))
+    else:
+        return flat
+
+    for key, value in items:
+        path = f"{prefix}.{key}" if prefix else key
+        if isinstance(value, (dict, list)):
+            flat.update(flatten_metrics(value, path))
+        elif isinstance(value, (int, float)) and key in COMPARED_METRICS:
+            flat[path] = float(value)
+    return flat
+
+
+def compare_to_baseline(current: Dict, baseline: Dict, max_regression_pct: float) -> List[str]:
+    """Print per-metric deltas and return the metrics that regressed past the threshold."""
+    cur, base = flatten_metrics(current["results"]), flatten_metrics(baseline["results"])
+    regressions = []
+    print("\n📊 Comparison against baseline")
+    for path in sorted(cur.keys() & base.keys()):
+        if base[path] == 0:
+            continue
+        change_pct = (cur[path] - base[path]) / base[path] * 100.0
+        higher_is_better = path.endswith("_per_sec")
+        worse_pct = -change_pct if higher_is_better else change_pct
+        flag = "❌" if worse_pct > max_regression_pct else "  "
+        print(f"{flag} {path:<50} {base[path]:>12.3f} -> {cur[path]:>12.3f} ({change_pct:+.1f}%)")
+        if worse_pct > max_regression_pct:
+            regressions.append(path)
+    return regressions
+
+
+# -------------------------------
+# ✅ Main Runner
+# -------------------------------
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument("--output", type=Path, default=Path("bench_results.json"))
+    parser.add_argument("--baseline", type=Path, help="Previous results JSON to compare against.")
+    parser.add_argument("--max-regression-pct", type=float, default=10.0)
+    parser.add_argument("--sizes", default="100,1000", help="Comma-separated corpus sizes.")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--top-k", type=int, default=5)
+    parser.add_argument("--conversion-repeat", type=int, default=5)
+    parser.add_argument("--ocr-images", type=int, default=6)
+    parser.add_argument("--docx-pages", type=int, default=150)
+    parser.add_argument("--http-requests", type=int, default=200)
+    parser.add_argument("--http-concurrency", type=int, default=8)
+    parser.add_argument("--http-port", type=int, default=8799)
+    parser.add_argument("--latency-ms", type=float, default=0.0, help="Simulated OpenAI latency.")
+    parser.add_argument("--skip", default="", help="Comma-separated phases to skip: index,quantization,conversion,docx,ocr,http")
+    parser.add_argument("--offline", action="store_true", help="Use local MiniLM embeddings, no OpenAI calls.")
+    parser.add_argument("--storage", default="flat", help="Vector storage for the index phase: flat, fp16, sq8, pq")
+    parser.add_argument("--quantization-size", type=int, default=5000)
+    parser.add_argument("--log-level", default="WARNING")
+    parser.add_argument("--keep-work-dir", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    skip = {s.strip() for s in args.skip.split(",") if s.strip()}
+    sizes = [int(s) for s in args.sizes.split(",") if s.strip()]
+
+    work_dir = Path(tempfile.mkdtemp(prefix="docbench_"))
+    fake = FakeOpenAIServer(latency_ms=args.latency_ms).start()
+    configure_environment(fake, work_dir, args.log_level.upper(), args.offline, args.storage)
+
+    results: Dict = {}
+    try:
+        if "index" not in skip:
+            results.update(bench_build_and_search(sizes, args.queries, args.top_k))
+            results["query_embedding"] = bench_concurrent_query_embedding(fake, args.queries * 4, args.http_concurrency * 2)
+        if "quantization" not in skip:
+            results["quantization"] = bench_quantization(args.quantization_size, args.queries, args.top_k, work_dir)
+        if "conversion" not in skip:
+            results["conversion"] = bench_conversions(work_dir, args.conversion_repeat)
+        if "docx" not in skip:
+            results["docx"] = bench_docx(work_dir, args.docx_pages, args.conversion_repeat)
+        if "ocr" not in skip:
+            results["ocr"] = bench_ocr(work_dir, args.ocr_images)
+        if "http" not in skip:
+            if "conversion" in skip:
+                build_file_corpus(work_dir / "corpus")
+            results["http"] = bench_http(work_dir, args.http_port, args.http_requests, args.http_concurrency)
+    finally:
+        fake.stop()
+        if not args.keep_work_dir:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    report = {
+        "meta": {
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "cpu_count": os.cpu_count(),
+            "args": {k: str(v) for k, v in vars(args).items()},
+            "fake_openai_calls": fake.calls,
+        },
+        "results": results,
+    }
+    args.output.write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"\n✅ Results written to {args.output}")
+
+    if args.baseline:
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        regressions = compare_to_baseline(report, baseline, args.max_regression_pct)
+        if regressions:
+            print(f"❌ {len(regressions)} metric(s) regressed by more than {args.max_regression_pct}%")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,45 +1,464 @@
+"""
+Bulk indexer: walk a directory of PDF, DOCX, TXT and image files and build
+the FAISS index from them.
+
+Text is extracted in a process pool with the ``doc_service`` extractors and
+embedded in batches. Near-duplicates of documents already seen (MinHash +
+LSH, as in API builds) are linked to their canonical row instead of being
+embedded. Every embedded batch is checkpointed to a state
+directory, so an interrupted run resumes where it stopped and a re-run only
+processes files it has not seen yet. Memory stays bounded: only a few
+batches of text are held at once and the final index is built from a
+memory-mapped vector file.
+
+Usage (from ``ai_document_research/``):
+    python scripts/build_index.py path/to/documents
+    python scripts/build_index.py path/to/documents --workers 8 --batch-size 200
+    python scripts/build_index.py path/to/documents --restart
+"""
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+import argparse
 import json
-from backend.app.services.vector_service import build_faiss_index_from_texts
+import logging
+import os
+import shutil
 import sys
+import time
+
+BACKEND_DIR = Path(__file__).resolve().parents[1] / "backend"
+sys.path.insert(0, str(BACKEND_DIR))
+
+import numpy as np  # noqa: E402
+
+from app.config.settings import settings  # noqa: E402
+from app.services.doc_service import SUPPORTED_EXTENSIONS  # noqa: E402
+from app.services.dedup_service import NearDuplicateIndex, minhash_signatures  # noqa: E402
+
+# -------------------------------
+# ✅ Defaults
+# -------------------------------
+DEFAULT_STATE_DIR = settings.vector_index_path.parent / "bulk_index_state"
+IN_FLIGHT_PER_WORKER = 4
+
+
+# -------------------------------
+# ✅ File Discovery + Extraction
+# -------------------------------
+def iter_files(root: Path) -> Iterator[Path]:
+    """Supported files under ``root`` in a stable (sorted) order, one directory at a time."""
+    for dirpath, dirnames, filenames in os.walk(root):
+        dirnames.sort()
+        for name in sorted(filenames):
+            path = Path(dirpath) / name
+            if path.suffix.lower() in SUPPORTED_EXTENSIONS:
+                yield path
+
+
+def extract_worker(path: str, rel: str) -> Tuple[str, str, str, Optional[np.ndarray]]:
+    """
+    Runs in a worker process; returns (relative path, text, error, MinHash
+    signature). The signature is only computed with dedup enabled.
+    """
+    from app.services.doc_service import extract_text
+    try:
+        text = extract_text(Path(path))
+    except Exception as e:
+        return rel, "", str(e), None
+    signature = None
+    if settings.dedup_enabled and text.strip():
+        signature = minhash_signatures([text], settings.dedup_num_perm, settings.dedup_shingle_words)[0]
+    return rel, text, "", signature
+
+
+# -------------------------------
+# ✅ Checkpoint State
+# -------------------------------
+class Checkpoint:
+    """
+    Append-only progress files in ``state_dir``:
+
+    - ``vectors.f32``: raw float32 rows, one per indexed document
+    - ``signatures.u32``: raw uint32 MinHash rows, same order (with dedup)
+    - ``docs.jsonl``: ``{"metadata", "text"}`` per row, same order
+    - ``duplicates.jsonl``: ``{"metadata", "canonical_row"}`` per near-duplicate
+    - ``skipped.jsonl``: files that yielded no text (not retried)
+    - ``checkpoint.json``: committed row and duplicate counts and the pinned embedder
+
+    Rows are only counted once ``checkpoint.json`` is rewritten, so any
+    partial write after the last commit is truncated away on resume.
+    """
+
+    def __init__(self, state_dir: Path):
+        self.dir = state_dir
+        self.vectors_path = state_dir / "vectors.f32"
+        self.signatures_path = state_dir / "signatures.u32"
+        self.docs_path = state_dir / "docs.jsonl"
+        self.duplicates_path = state_dir / "duplicates.jsonl"
+        self.skipped_path = state_dir / "skipped.jsonl"
+        self.state_path = state_dir / "checkpoint.json"
+        self.state: Dict = {"rows": 0, "duplicates": 0, "provider": None, "model": None, "dim": None}
+        # Row of every committed document, and LSH buckets over their signatures
+        self.row_of: Dict[str, int] = {}
+        self.dedup: Optional[NearDuplicateIndex] = None
+
+    def load(self) -> Set[str]:
+        """Restore committed state and return the relative paths already handled."""
+        self.dir.mkdir(parents=True, exist_ok=True)
+        if self.state_path.exists():
+            self.state = {**self.state, **json.loads(self.state_path.read_text(encoding="utf-8"))}
+
+        rows, dim = self.state["rows"], self.state["dim"] or 0
+        if self.vectors_path.exists():
+            with self.vectors_path.open("r+b") as f:
+                f.truncate(rows * dim * 4)
+        if self.signatures_path.exists():
+            with self.signatures_path.open("r+b") as f:
+                f.truncate(rows * (self.state.get("dedup_num_perm") or 0) * 4)
+
+        if self.docs_path.exists():
+            with self.docs_path.open("r+b") as f:
+                offset = 0
+                for row in range(rows):
+                    line = f.readline()
+                    self.row_of[json.loads(line)["metadata"]] = row
+                    offset += len(line)
+                f.truncate(offset)
+        done: Set[str] = set(self.row_of)
+
+        if self.duplicates_path.exists():
+            with self.duplicates_path.open("r+b") as f:
+                offset = 0
+                for _ in range(self.state["duplicates"]):
+                    line = f.readline()
+                    done.add(json.loads(line)["metadata"])
+                    offset += len(line)
+                f.truncate(offset)
+
+        self._load_dedup()
+
+        if self.skipped_path.exists():
+            with self.skipped_path.open("r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        done.add(json.loads(line)["metadata"])
+                    except (ValueError, KeyError):
+                        continue  # torn last line from an interrupted run
+        return done
+
+    def _load_dedup(self) -> None:
+        """Rebuild the LSH buckets from the committed signatures."""
+        if not settings.dedup_enabled:
+            return
+        rows, num_perm = self.state["rows"], self.state.get("dedup_num_perm")
+        if rows and num_perm != settings.dedup_num_perm:
+            print("⚠️ Checkpoint was started without near-duplicate detection (or with another "
+                  "DEDUP_NUM_PERM); it stays off until --restart.")
+            return
+
+        self.dedup = NearDuplicateIndex(settings.dedup_num_perm, settings.dedup_threshold)
+        self.dedup.candidates_checked = self.state.get("dedup_candidates_checked", 0)
+        signatures = self.signatures()
+        if signatures is not None:
+            for rel, row in self.row_of.items():
+                self.dedup.add(signatures[row], rel)
+
+    def signatures(self) -> Optional[np.ndarray]:
+        """Memory-mapped signatures of the committed rows, or None without dedup."""
+        rows, num_perm = self.state["rows"], self.state.get("dedup_num_perm")
+        if not rows or not num_perm or not self.signatures_path.exists():
+            return None
+        return np.memmap(self.signatures_path, dtype=np.uint32, mode="r", shape=(rows, num_perm))
+
+    def pin_embedder(self, provider: str, model: str, dim: int) -> None:
+        self.state.update({"provider": provider, "model": model, "dim": dim})
+
+    def commit(self, vectors: Optional[np.ndarray], docs: List[Tuple[str, str, Optional[np.ndarray]]],
+               duplicates: List[Tuple[str, int]]) -> None:
+        if docs:
+            with self.vectors_path.open("ab") as f:
+                f.write(np.ascontiguousarray(vectors, dtype=np.float32).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        if docs and self.dedup is not None:
+            with self.signatures_path.open("ab") as f:
+                f.write(np.vstack([signature for _, _, signature in docs]).astype(np.uint32).tobytes())
+                f.flush()
+                os.fsync(f.fileno())
+        with self.docs_path.open("a", encoding="utf-8") as f:
+            for rel, text, _ in docs:
+                f.write(json.dumps({"metadata": rel, "text": text}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+        with self.duplicates_path.open("a", encoding="utf-8") as f:
+            for rel, row in duplicates:
+                f.write(json.dumps({"metadata": rel, "canonical_row": row}) + "\n")
+            f.flush()
+            os.fsync(f.fileno())
+
+        for rel, _, _ in docs:
+            self.row_of[rel] = self.state["rows"]
+            self.state["rows"] += 1
+        self.state["duplicates"] += len(duplicates)
+        if self.dedup is not None:
+            self.state["dedup_num_perm"] = settings.dedup_num_perm
+            self.state["dedup_candidates_checked"] = self.dedup.candidates_checked
+        elif docs:
+            # Rows without signatures: the signature file no longer lines up
+            self.state["dedup_num_perm"] = None
+        tmp = self.state_path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(self.state, indent=2), encoding="utf-8")
+        tmp.replace(self.state_path)
+
+    def skip(self, rel: str, reason: str) -> None:
+        with self.skipped_path.open("a", encoding="utf-8") as f:
+            f.write(json.dumps({"metadata": rel, "reason": reason}) + "\n")
+
+    def iter_docs(self) -> Iterator[Dict]:
+        with self.docs_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
+    def iter_duplicates(self) -> Iterator[Dict]:
+        if not self.duplicates_path.exists():
+            return
+        with self.duplicates_path.open("r", encoding="utf-8") as f:
+            for line in f:
+                yield json.loads(line)
+
 
-sys.path.append(str(Path(__file__).resolve().parents[1]))
 # -------------------------------
-# ✅ File Paths
+# ✅ Progress Reporting
 # -------------------------------
-DATA_DIR = Path("backend/data")
-DOC_STORE_FILE = DATA_DIR / "doc_store.txt"
-METADATA_FILE = DATA_DIR / "metadata.json"
+class Progress:
+    def __init__(self, every_seconds: float, already_indexed: int):
+        self.every = every_seconds
+        self.start = self.last = time.perf_counter()
+        self.already = already_indexed
+        self.extracted = self.embedded = self.duplicates = self.skipped = self.chars = 0
+
+    def maybe_report(self, force: bool = False) -> None:
+        now = time.perf_counter()
+        if not force and now - self.last < self.every:
+            return
+        self.last = now
+        elapsed = max(now - self.start, 1e-9)
+        print(
+            f"⏱️ {elapsed:7.1f}s | extracted {self.extracted} ({self.extracted / elapsed:.1f} files/s) | "
+            f"embedded {self.embedded} ({self.embedded / elapsed:.1f} docs/s) | duplicates {self.duplicates} | "
+            f"skipped {self.skipped} | "
+            f"{self.chars / elapsed / 1e6:.2f} MB text/s | total indexed {self.already + self.embedded}",
+            flush=True
+        )
+
 
 # -------------------------------
-# ✅ Load Documents
+# ✅ Embedding
 # -------------------------------
-def load_documents() -> list[str]:
-    if not DOC_STORE_FILE.exists():
-        raise FileNotFoundError(f"❌ Document file not found: {DOC_STORE_FILE}")
-    with DOC_STORE_FILE.open("r", encoding="utf-8") as f:
-        return [line.strip() for line in f if line.strip()]
+def resolve_embedder(checkpoint: Checkpoint):
+    from app.services.embedding_service import get_embedder, default_provider
+
+    if checkpoint.state["provider"]:
+        return get_embedder(checkpoint.state["provider"], checkpoint.state["model"])
+    return get_embedder(default_provider())
+
+
+def embed_batch(checkpoint: Checkpoint, embedder, batch: List[Tuple[str, str, Optional[np.ndarray]]],
+                duplicates: List[Tuple[str, str]]):
+    """
+    Embed and commit one batch together with the near-duplicates found
+    since the last commit (``(relative path, canonical relative path)``).
+
+    Returns the embedder (it may switch before the first commit), the number
+    of documents the embedder rejected and the number of duplicates skipped
+    because their canonical document was rejected.
+    """
+    from app.services.embedding_service import (
+        EmbeddingUnavailableError,
+        OPENAI_PROVIDER,
+        LOCAL_PROVIDER,
+        embed_or_skip,
+        get_embedder
+    )
+
+    vectors, rejected = None, []
+    if batch:
+        texts = [text for _, text, _ in batch]
+        try:
+            vectors, rejected = embed_or_skip(embedder, texts)
+        except EmbeddingUnavailableError as e:
+            # Switching providers is only safe while no vector has been committed
+            if checkpoint.state["rows"] or embedder.provider != OPENAI_PROVIDER or not settings.embedding_fallback_to_local:
+                raise
+            print(f"⚠️ {e} — indexing with the local model instead.")
+            embedder = get_embedder(LOCAL_PROVIDER)
+            vectors, rejected = embed_or_skip(embedder, texts)
+
+    for position, reason in rejected:
+        checkpoint.skip(batch[position][0], reason)
+    if rejected:
+        skipped = {position for position, _ in rejected}
+        batch = [doc for position, doc in enumerate(batch) if position not in skipped]
+
+    # Canonicals are either committed or in this batch; a rejected one takes its duplicates with it
+    batch_rows = {rel: checkpoint.state["rows"] + i for i, (rel, _, _) in enumerate(batch)}
+    linked, orphaned = [], 0
+    for rel, canonical in duplicates:
+        row = checkpoint.row_of.get(canonical, batch_rows.get(canonical))
+        if row is None:
+            checkpoint.skip(rel, f"near-duplicate of skipped document {canonical}")
+            orphaned += 1
+        else:
+            linked.append((rel, row))
+
+    if not batch and not linked:
+        return embedder, len(rejected), orphaned
+    if batch and checkpoint.state["dim"] is None:
+        checkpoint.pin_embedder(embedder.provider, embedder.model, int(vectors.shape[1]))
+    checkpoint.commit(vectors, batch, linked)
+    return embedder, len(rejected), orphaned
+
 
 # -------------------------------
-# ✅ Load Metadata
+# ✅ Finalize
 # -------------------------------
-def load_metadata() -> list[str]:
-    if not METADATA_FILE.exists():
-        raise FileNotFoundError(f"❌ Metadata file not found: {METADATA_FILE}")
-    with METADATA_FILE.open("r", encoding="utf-8") as f:
-        return json.load(f)
+def finalize(checkpoint: Checkpoint) -> None:
+    from app.services.vector_service import write_index_from_vectors
+
+    rows, dim = checkpoint.state["rows"], checkpoint.state["dim"]
+    if not rows:
+        print("⚠️ Nothing indexed; existing index left untouched.")
+        return
+
+    duplicates: Dict[str, List[str]] = {}
+    for duplicate in checkpoint.iter_duplicates():
+        duplicates.setdefault(str(duplicate["canonical_row"]), []).append(duplicate["metadata"])
+    dedup_stats = {}
+    if checkpoint.dedup is not None:
+        dedup_stats = checkpoint.dedup.stats(rows + checkpoint.state["duplicates"], checkpoint.state["duplicates"])
+
+    print(f"🏗️ Writing FAISS index for {rows} documents ({checkpoint.state['duplicates']} near-duplicates linked)...")
+    vectors = np.memmap(checkpoint.vectors_path, dtype=np.float32, mode="r", shape=(rows, dim))
+    metadata = [doc["metadata"] for doc in checkpoint.iter_docs()]
+    info = {"provider": checkpoint.state["provider"], "model": checkpoint.state["model"], "dim": dim}
+    write_index_from_vectors(
+        vectors,
+        info,
+        metadata,
+        (doc["text"] for doc in checkpoint.iter_docs()),
+        signatures=checkpoint.signatures() if checkpoint.dedup is not None else None,
+        duplicates=duplicates,
+        dedup_stats=dedup_stats
+    )
+
 
 # -------------------------------
 # ✅ Main Runner
 # -------------------------------
-if __name__ == "__main__":
-    print("📦 Loading documents and metadata...")
-    documents = load_documents()
-    metadata = load_metadata()
+def run(root: Path, state_dir: Path, workers: int, batch_size: int, report_every: float,
+        restart: bool, do_finalize: bool, limit: Optional[int] = None) -> None:
+    if restart and state_dir.exists():
+        shutil.rmtree(state_dir)
+
+    checkpoint = Checkpoint(state_dir)
+    done = checkpoint.load()
+    if done:
+        print(f"🔁 Resuming: {checkpoint.state['rows']} documents already indexed, {len(done)} files handled.")
+
+    embedder = resolve_embedder(checkpoint)
+    progress = Progress(report_every, checkpoint.state["rows"])
+    batch: List[Tuple[str, str, Optional[np.ndarray]]] = []
+    duplicates: List[Tuple[str, str]] = []
+    pending: deque = deque()
+    max_in_flight = workers * IN_FLIGHT_PER_WORKER
+
+    def flush() -> None:
+        nonlocal embedder, batch, duplicates
+        embedder, rejected, orphaned = embed_batch(checkpoint, embedder, batch, duplicates)
+        progress.embedded += len(batch) - rejected
+        progress.duplicates += len(duplicates) - orphaned
+        progress.skipped += rejected + orphaned
+        batch, duplicates = [], []
+
+    def handle(result: Tuple[str, str, str, Optional[np.ndarray]]) -> None:
+        rel, text, error, signature = result
+        progress.extracted += 1
+        if error or not text.strip():
+            progress.skipped += 1
+            checkpoint.skip(rel, error or "no text extracted")
+            return
+
+        progress.chars += len(text)
+        # Near-duplicates are not embedded; they are linked to their canonical row instead
+        canonical = checkpoint.dedup.match(signature) if checkpoint.dedup is not None else None
+        if canonical is not None:
+            duplicates.append((rel, canonical))
+        else:
+            if checkpoint.dedup is not None:
+                checkpoint.dedup.add(signature, rel)
+            batch.append((rel, text, signature))
 
-    print(f"📄 Documents loaded: {len(documents)}")
-    print(f"🧾 Metadata entries: {len(metadata)}")
+        if len(batch) >= batch_size or len(duplicates) >= batch_size:
+            flush()
+        progress.maybe_report()
 
-    print("🚀 Building FAISS index...")
-    build_faiss_index_from_texts(documents, metadata)
-    print("✅ All done!")
\ No newline at end of file
+    print(f"📦 Indexing {root} with {workers} extraction workers, batch size {batch_size}...")
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        submitted = 0
+        for path in iter_files(root):
+            rel = path.relative_to(root).as_posix()
+            if rel in done:
+                continue
+            if limit is not None and submitted >= limit:
+                break
+            pending.append(pool.submit(extract_worker, str(path), rel))
+            submitted += 1
+            # Results are consumed in submission order, so at most
+            # ``max_in_flight`` extracted texts are ever held in memory.
+            while len(pending) >= max_in_flight:
+                handle(pending.popleft().result())
+
+        while pending:
+            handle(pending.popleft().result())
+
+    if batch or duplicates:
+        flush()
+    progress.maybe_report(force=True)
+
+    if do_finalize:
+        finalize(checkpoint)
+    print("✅ All done!")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Bulk-index a directory of documents into the FAISS index.")
+    parser.add_argument("root", type=Path, help="Directory to walk for .pdf, .docx, .txt and image files.")
+    parser.add_argument("--state-dir", type=Path, default=DEFAULT_STATE_DIR,
+                        help="Checkpoint directory (reused across runs to resume).")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--batch-size", type=int, default=settings.embedding_batch_size)
+    parser.add_argument("--report-every", type=float, default=5.0, help="Seconds between progress lines.")
+    parser.add_argument("--limit", type=int, help="Stop after this many new files (useful for trial runs).")
+    parser.add_argument("--restart", action="store_true", help="Discard the checkpoint and start over.")
+    parser.add_argument("--no-finalize", action="store_true", help="Only embed; do not write the FAISS index yet.")
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    # Progress goes to stdout; service logs only surface warnings and errors
+    logging.basicConfig(level=logging.WARNING)
+    args = parse_args()
+    if not args.root.is_dir():
+        sys.exit(f"❌ Not a directory: {args.root}")
+    run(
+        root=args.root.resolve(),
+        state_dir=args.state_dir,
+        workers=max(1, args.workers),
+        batch_size=max(1, args.batch_size),
+        report_every=args.report_every,
+        restart=args.restart,
+        do_finalize=not args.no_finalize,
+        limit=args.limit
+    )
\ No newline at end of file